@@ -0,0 +1,17 @@
+import secrets
+from typing import Optional
+from fastapi import Header, HTTPException
+from .config import settings
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Whether token is the configured ADMIN_TOKEN; always False while it is unset."""
+    return bool(settings.ADMIN_TOKEN) and token is not None and secrets.compare_digest(token, settings.ADMIN_TOKEN)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Dependency for admin endpoints: 404 while ADMIN_TOKEN is unset, 403 for a wrong token."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
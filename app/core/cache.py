@@ -0,0 +1,191 @@
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Hashable, Iterator, Optional, Tuple
+from .http_cache import make_etag
+
+# Set while reads may see uncommitted data (inside a batch), so nothing they load is shared
+_bypass: ContextVar[bool] = ContextVar("cache_bypass", default=False)
+
+
+def caches_bypassed() -> bool:
+    return _bypass.get()
+
+
+@contextmanager
+def bypass_caches() -> Iterator[None]:
+    """Make the shared caches call their loaders directly, storing nothing, until the block exits."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+class VersionedCache:
+    """
+    Cache of pre-serialized responses tied to a data version counter.
+
+    Every write bumps the version and drops all entries, so an ETag built
+    from (version, key) can be checked without loading anything.
+    """
+
+    def __init__(self, name: str, max_entries: int = 256):
+        self.name = name
+        self.max_entries = max_entries
+        self._epoch = os.urandom(4).hex()
+        self._version = 0
+        self._entries: Dict[Hashable, Tuple[bytes, str]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> None:
+        """Bump the version and drop every cached entry."""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def etag(self, key: Hashable) -> str:
+        """Get the ETag for a key at the current version."""
+        return self._etag(self._version, key)
+
+    def get(self, key: Hashable, loader: Callable[[], bytes]) -> Tuple[bytes, str]:
+        """Get the cached body and ETag for a key, calling loader on a miss."""
+        if _bypass.get():
+            content = loader()
+            return content, make_etag(content)
+
+        with self._lock:
+            version = self._version
+            entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        entry = (loader(), self._etag(version, key))
+        with self._lock:
+            # Only keep it if no write happened while it was being built
+            if version == self._version:
+                if len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+                self._entries[key] = entry
+        return entry
+
+    def _etag(self, version: int, key: Hashable) -> str:
+        return make_etag(f"{self.name}:{self._epoch}:{version}:{key!r}".encode())
+
+
+class ByteLRUCache:
+    """
+    Least-recently-used cache of byte strings bounded by their total size.
+
+    Keys are expected to be content hashes. When a directory is given,
+    entries are also written there and misses fall back to it, so the
+    cache survives restarts and is shared between workers.
+    """
+
+    def __init__(self, max_bytes: int, directory: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str, loader: Callable[[], bytes]) -> bytes:
+        """Get the bytes for a key, calling loader only if neither memory nor disk has them."""
+        if _bypass.get():
+            return loader()
+
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = self._read_disk(key)
+        if value is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            value = loader()
+            with self._lock:
+                self.misses += 1
+            self._write_disk(key, value)
+        self._store(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Drop every in-memory entry; files on disk are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        """Hit counters and current memory usage."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+    def _store(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, value: bytes) -> None:
+        if not self.directory:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+
+catalog_cache = VersionedCache("catalog")
@@ -0,0 +1,39 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+# Every write to foods (ORM, bulk upsert or raw SQL) stamps the food with the
+# next change sequence number. Deletes leave a tombstone row behind.
+# UPDATE-then-INSERT rather than INSERT OR REPLACE: an outer UPSERT's conflict
+# handling would override the trigger's REPLACE.
+_STAMP_CHANGE = """
+    UPDATE food_changes
+    SET seq = (SELECT max(seq) + 1 FROM food_changes), deleted = {deleted}, changed_at = CURRENT_TIMESTAMP
+    WHERE food_id = {row}.id;
+    INSERT INTO food_changes(food_id, seq, deleted, changed_at)
+    SELECT {row}.id, (SELECT coalesce(max(seq), 0) + 1 FROM food_changes), {deleted}, CURRENT_TIMESTAMP
+    WHERE NOT EXISTS (SELECT 1 FROM food_changes WHERE food_id = {row}.id);
+"""
+
+FOOD_CHANGE_DDL = [
+    "CREATE TRIGGER IF NOT EXISTS food_changes_ai AFTER INSERT ON foods BEGIN"
+    + _STAMP_CHANGE.format(row="new", deleted=0) + "END",
+    "CREATE TRIGGER IF NOT EXISTS food_changes_au AFTER UPDATE ON foods BEGIN"
+    + _STAMP_CHANGE.format(row="new", deleted=0) + "END",
+    "CREATE TRIGGER IF NOT EXISTS food_changes_ad AFTER DELETE ON foods BEGIN"
+    + _STAMP_CHANGE.format(row="old", deleted=1) + "END",
+]
+
+
+def create_food_change_triggers(engine: Engine) -> None:
+    """Create the change-tracking triggers, seeding the log for foods that predate them."""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        for statement in FOOD_CHANGE_DDL:
+            conn.execute(text(statement))
+        conn.execute(text(
+            "INSERT INTO food_changes(food_id, seq, deleted, changed_at) "
+            "SELECT id, (SELECT coalesce(max(seq), 0) FROM food_changes) + row_number() OVER (ORDER BY id), "
+            "0, coalesce(updated_at, CURRENT_TIMESTAMP) "
+            "FROM foods WHERE id NOT IN (SELECT food_id FROM food_changes)"
+        ))
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
@@ -14,6 +15,58 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Food Shop API"
     PROJECT_VERSION: str = "1.0.0"
     
+    # Frontend
+    RELOAD_INDEX: bool = False  # re-read index.html when it changes (development)
+    
+    # Catalog
+    FOOD_IMPORT_CHUNK_SIZE: int = 1000
+    
+    # Serve order and payment lists from row tuples with the fast encoder,
+    # skipping response_model validation (?fields= always does)
+    FAST_LIST_SERIALIZATION: bool = False
+    
+    # Prometheus metrics at /metrics
+    METRICS: bool = True
+    
+    # Per-request query counts: Server-Timing header, and warnings past these limits
+    SERVER_TIMING: bool = True
+    QUERY_COUNT_WARN: int = 20
+    QUERY_TIME_WARN_MS: float = 200.0
+    N_PLUS_ONE_THRESHOLD: int = 5  # runs of one statement in a request
+    
+    # Statements slower than this are kept, with their query plans, at /admin/slow-queries
+    SLOW_QUERY_MS: float = 100.0
+    SLOW_QUERY_LOG_SIZE: int = 100
+    SLOW_QUERY_LOG_FILE: Optional[str] = None  # also append them here as JSON lines
+    
+    # Sent as X-Admin-Token to reach /admin; admin endpoints are off while unset
+    ADMIN_TOKEN: Optional[str] = None
+    
+    # Adaptive concurrency limits per route class; excess requests get 503
+    LOAD_SHEDDING: bool = True
+    LOAD_SHED_RETRY_AFTER: int = 1
+    READ_CONCURRENCY: int = 32
+    READ_TARGET_LATENCY: float = 0.25
+    WRITE_CONCURRENCY: int = 8
+    WRITE_TARGET_LATENCY: float = 0.5
+    QR_CONCURRENCY: int = 8
+    QR_TARGET_LATENCY: float = 1.0
+    
+    # Identical concurrent reads share one query; some results are reused this long
+    COALESCE_TTL_SECONDS: float = 1.0
+    
+    # Server-sent events
+    SSE_QUEUE_SIZE: int = 100
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+    
+    # QR codes
+    QR_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    QR_CACHE_DIR: Optional[str] = None
+    QR_RENDER_WORKERS: int = 2
+    QR_RENDER_QUEUE: int = 16
+    QR_RENDER_RETRY_AFTER: int = 1
+    QR_IMAGE_MAX_AGE: int = 365 * 24 * 3600
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,13 +1,31 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional, Tuple
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from .cache import bypass_caches
 from .config import settings
+from .change_tracking import create_food_change_triggers
+from .fts import create_food_search_index
+from .metrics import TimedQueuePool, registry
+from .query_stats import instrument_queries
+from .slow_queries import slow_query_log
 
-# Create SQLite engine
+# Create SQLite engine; in-memory databases keep SQLAlchemy's default single-connection pool
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False},
     echo=settings.ECHO_SQL,
+    **({} if ":memory:" in settings.DATABASE_URL else {"poolclass": TimedQueuePool}),
 )
+instrument_queries(engine)
+slow_query_log.install(engine)
+
+
+@registry.callback("db_pool_connections_checked_out", "Database connections currently in use.")
+def _collect_pool_usage():
+    checkedout = getattr(engine.pool, "checkedout", None)
+    return [((), checkedout())] if checkedout else []
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -16,8 +34,36 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+# Set while a batch request runs, so all of its sub-requests share one session
+_shared_session: ContextVar[Optional[Session]] = ContextVar("shared_session", default=None)
+
+# Set while an atomic batch runs: side effects held until its transaction commits
+_pending_effects: ContextVar[Optional[List[Tuple[Callable, tuple]]]] = ContextVar("pending_effects", default=None)
+
+
+def after_commit(func: Callable, *args) -> None:
+    """
+    Run func(*args) once the writes it announces are committed.
+    
+    That is straight away, except inside an atomic batch, where a
+    repository's commit only releases a savepoint: there it runs when the
+    whole batch commits, and never if it rolls back.
+    """
+    pending = _pending_effects.get()
+    if pending is None:
+        func(*args)
+    else:
+        pending.append((func, args))
+
+
 def get_db():
     """Dependency injection for database session."""
+    shared = _shared_session.get()
+    if shared is not None:
+        # Owned (and closed) by shared_session()
+        yield shared
+        return
+    
     db = SessionLocal()
     try:
         yield db
@@ -25,6 +71,55 @@ def get_db():
         db.close()
 
 
+@contextmanager
+def shared_session(atomic: bool = False) -> Iterator[Session]:
+    """
+    Make every get_db() in this context use the same session.
+    
+    With atomic=True it all runs in one transaction: the repositories'
+    commits only release savepoints, and the work is committed when the
+    context exits cleanly or rolled back if it raises. Effects registered
+    with after_commit() run after that commit. The shared caches and the
+    read coalescer are bypassed throughout, so nothing read through this
+    session is served to other requests.
+    """
+    connection = transaction = None
+    if atomic:
+        connection = engine.connect()
+        transaction = connection.begin()
+        if engine.dialect.name == "sqlite":
+            # pysqlite only sends BEGIN before the first write; without it the
+            # first SAVEPOINT would open the transaction and its RELEASE commit it
+            connection.exec_driver_sql("BEGIN")
+        session = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
+    else:
+        session = SessionLocal()
+    
+    pending: Optional[List[Tuple[Callable, tuple]]] = [] if atomic else None
+    token = _shared_session.set(session)
+    effects_token = _pending_effects.set(pending)
+    try:
+        with bypass_caches():
+            yield session
+        if transaction is not None:
+            transaction.commit()
+    except BaseException:
+        if transaction is not None:
+            transaction.rollback()
+        raise
+    finally:
+        _pending_effects.reset(effects_token)
+        _shared_session.reset(token)
+        session.close()
+        if connection is not None:
+            connection.close()
+    
+    for func, args in pending or ():
+        func(*args)
+
+
 def create_tables():
     """Create all database tables."""
     Base.metadata.create_all(bind=engine)
+    create_food_search_index(engine)
+    create_food_change_triggers(engine)
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import Deque, List, Optional, Set, Tuple
+from .config import settings
+
+# Pushed to a subscriber in place of further events once it has been dropped
+RESET = None
+
+
+class Subscription:
+    """A single client's bounded queue of pre-encoded server-sent events."""
+
+    def __init__(self, max_queue: int):
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.dropped = False
+        self.last_id = 0
+
+    def put(self, event_id: int, message: bytes) -> None:
+        """Queue a message unless it was already queued; raises QueueFull."""
+        if event_id > self.last_id:
+            self.queue.put_nowait(message)
+            self.last_id = event_id
+
+
+class BroadcastHub:
+    """
+    In-process fan-out of change events to server-sent event clients.
+
+    Publishers may run on any thread (route handlers run in the threadpool);
+    fan-out always happens on the event loop. Each event is encoded once and
+    the same bytes are queued for every subscriber. A subscriber whose queue
+    fills up is dropped and told to reset, instead of slowing down everyone
+    else. Recent events are kept so reconnecting clients can resume from
+    Last-Event-ID.
+    """
+
+    def __init__(self, max_queue: int = 100, history: int = 1000):
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscribers: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sequence = 0
+        self._history: Deque[Tuple[int, bytes]] = deque(maxlen=history)
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        """Register a subscriber; must be called from the event loop."""
+        subscription = Subscription(self.max_queue)
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            backlog = self._backlog(last_event_id)
+            self._subscribers.add(subscription)
+
+        if backlog is None or len(backlog) >= self.max_queue:
+            self._drop(subscription)
+        else:
+            for event_id, message in backlog:
+                subscription.put(event_id, message)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event: str, data: dict) -> None:
+        """Queue an event for every subscriber; safe to call from any thread."""
+        with self._lock:
+            self._sequence += 1
+            event_id = self._sequence
+            message = (
+                f"id: {event_id}\nevent: {event}\n"
+                f"data: {json.dumps(data, separators=(',', ':'), default=str)}\n\n"
+            ).encode()
+            self._history.append((event_id, message))
+            self.published += 1
+            if not self._subscribers or self._loop is None:
+                return
+            try:
+                # Scheduled under the lock so events reach the loop in id order
+                self._loop.call_soon_threadsafe(self._fan_out, event_id, message)
+            except RuntimeError:
+                # The loop that owned the subscribers has shut down
+                self._subscribers.clear()
+                self._loop = None
+
+    def _backlog(self, last_event_id: Optional[int]) -> Optional[List[Tuple[int, bytes]]]:
+        """Events after last_event_id, or None if they are no longer available."""
+        if last_event_id is None:
+            return []
+        if last_event_id > self._sequence:
+            return None
+        oldest = self._history[0][0] if self._history else self._sequence + 1
+        if last_event_id < oldest - 1:
+            return None
+        return [entry for entry in self._history if entry[0] > last_event_id]
+
+    def _fan_out(self, event_id: int, message: bytes) -> None:
+        for subscription in list(self._subscribers):
+            try:
+                subscription.put(event_id, message)
+            except asyncio.QueueFull:
+                self._drop(subscription)
+
+    def _drop(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+            self.dropped += 1
+        subscription.dropped = True
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(RESET)
+
+
+food_events = BroadcastHub(max_queue=settings.SSE_QUEUE_SIZE)
@@ -0,0 +1,74 @@
+import hashlib
+from typing import Dict, Optional, Sequence
+from fastapi import Request, Response
+
+
+def make_etag(content: bytes) -> str:
+    """Build a strong ETag from response content."""
+    return f'"{hashlib.blake2b(content, digest_size=12).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match header matches an ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def accepted_encodings(request: Request) -> Dict[str, float]:
+    """Parse Accept-Encoding into {coding: q}."""
+    accepted = {}
+    for item in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(request: Request, available: Sequence[str]) -> str:
+    """Pick the first of the available codings the client accepts, else "identity"."""
+    accepted = accepted_encodings(request)
+    for coding in available:
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return "identity"
+
+
+def cached_response(
+    request: Request,
+    content: bytes,
+    etag: str,
+    media_type: str = "application/json",
+    cache_control: Optional[str] = "no-cache",
+    content_encoding: Optional[str] = None,
+) -> Response:
+    """
+    Return the content, or 304 Not Modified when the client already has it.
+
+    Pass content_encoding for a negotiated (compressed) variant; each variant
+    needs its own ETag.
+    """
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    if content_encoding is not None:
+        headers["Vary"] = "Accept-Encoding"
+        if content_encoding != "identity":
+            headers["Content-Encoding"] = content_encoding
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type=media_type, headers=headers)
@@ -0,0 +1,163 @@
+import json
+import time
+from typing import Callable, Dict, Optional
+from .config import settings
+from .metrics import registry
+
+# Never limited: liveness probes, scrapes, and requests that stay open for seconds to minutes
+EXEMPT_PATHS = {
+    "/health",
+    "/metrics",
+    f"{settings.API_V1_STR}/foods/stream",
+    f"{settings.API_V1_STR}/admin/profile",
+}
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit for one class of routes, adapted with AIMD.
+
+    Each request that finishes within the target latency raises the limit by
+    1/limit (about +1 per limit's worth of requests); a slower one cuts it by
+    `backoff`, at most once per target interval so a single burst of slow
+    completions does not collapse it. Only used from the event loop, so it
+    needs no lock.
+    """
+
+    def __init__(
+        self, name: str, max_limit: int, target_latency: float, min_limit: int = 1, backoff: float = 0.9
+    ):
+        self.name = name
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+        self._last_decrease = 0.0
+
+    def try_acquire(self) -> bool:
+        """Take a slot if the class is under its current limit."""
+        if self.in_flight >= int(self.limit):
+            self.shed += 1
+            return False
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def release(self, latency: float) -> None:
+        """Free a slot and adapt the limit to the request's latency in seconds."""
+        self.in_flight -= 1
+        if latency <= self.target_latency:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            return
+        now = time.monotonic()
+        if now - self._last_decrease >= self.target_latency:
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
+
+
+def route_class(scope: dict) -> Optional[str]:
+    """Classify a request as "qr", "write" or "read"; None for exempt requests."""
+    path = scope["path"]
+    if path in EXEMPT_PATHS:
+        return None
+    if path.startswith((f"{settings.API_V1_STR}/qr/", "/qr/")):
+        return "qr"
+    return "read" if scope["method"] in READ_METHODS else "write"
+
+
+def default_limiters() -> Dict[str, AdaptiveLimiter]:
+    return {
+        "read": AdaptiveLimiter("read", settings.READ_CONCURRENCY, settings.READ_TARGET_LATENCY),
+        "write": AdaptiveLimiter("write", settings.WRITE_CONCURRENCY, settings.WRITE_TARGET_LATENCY),
+        "qr": AdaptiveLimiter("qr", settings.QR_CONCURRENCY, settings.QR_TARGET_LATENCY),
+    }
+
+
+class LoadSheddingMiddleware:
+    """
+    Reject requests beyond each route class's adaptive concurrency limit.
+
+    Shed requests get 503 with Retry-After straight away instead of queueing
+    in the threadpool or on the SQLite write lock, so the admitted ones keep
+    their latency. Sub-requests of a batch were admitted with the batch and
+    are not limited again.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiters: Optional[Dict[str, AdaptiveLimiter]] = None,
+        classify: Callable[[dict], Optional[str]] = route_class,
+        retry_after: int = 1,
+    ):
+        self.app = app
+        self.limiters = limiters if limiters is not None else default_limiters()
+        self.classify = classify
+        self.retry_after = retry_after
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.LOAD_SHEDDING or scope.get("batched"):
+            await self.app(scope, receive, send)
+            return
+        name = self.classify(scope)
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[name]
+        if not limiter.try_acquire():
+            await self._reject(send, name)
+            return
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - start)
+
+    async def _reject(self, send, name: str) -> None:
+        body = json.dumps({"detail": f"Server is overloaded ({name} requests), retry in {self.retry_after}s"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# The app's limiters, one per route class
+concurrency_limiters = default_limiters()
+
+
+@registry.callback("load_shed_limit", "Current adaptive concurrency limit.", label_names=("class",))
+def _collect_limits():
+    return [((name,), round(limiter.limit, 2)) for name, limiter in concurrency_limiters.items()]
+
+
+@registry.callback("load_shed_in_flight", "Requests in flight per route class.", label_names=("class",))
+def _collect_in_flight():
+    return [((name,), limiter.in_flight) for name, limiter in concurrency_limiters.items()]
+
+
+@registry.callback(
+    "load_shed_rejected_total", "Requests rejected with 503.", type="counter", label_names=("class",)
+)
+def _collect_shed():
+    return [((name,), limiter.shed) for name, limiter in concurrency_limiters.items()]
@@ -0,0 +1,174 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+from sqlalchemy.pool import QueuePool
+from .config import settings
+
+# Upper bounds in seconds, from a cached 304 up to a stalled write
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Histogram:
+    """Fixed-bucket histogram per label set, rendered in Prometheus text format."""
+
+    def __init__(
+        self, name: str, help: str, label_names: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # label values -> [count per bucket (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(counts), total[0]) for labels, (counts, total) in sorted(self._series.items())]
+        names = self.label_names + ("le",)
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(names, labels + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+class CallbackMetric:
+    """Gauge or counter whose samples are read from the app's own state at scrape time."""
+
+    def __init__(
+        self, name: str, help: str, type: str, label_names: Sequence[str], collect: Callable[[], list]
+    ):
+        self.name = name
+        self.help = help
+        self.type = type
+        self.label_names = tuple(label_names)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for labels, value in self.collect():
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class MetricsRegistry:
+    """The metrics exposed at /metrics."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def callback(self, name: str, help: str, type: str = "gauge", label_names: Sequence[str] = ()):
+        """Register a function returning [(label values, value)] as a metric."""
+        def register(collect: Callable[[], list]) -> Callable[[], list]:
+            self._metrics.append(CallbackMetric(name, help, type, label_names, collect))
+            return collect
+        return register
+
+    def render(self) -> bytes:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return ("\n".join(lines) + "\n").encode()
+
+
+registry = MetricsRegistry()
+
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "Time to serve a request, by route template and status.",
+    ("method", "route", "status"),
+)
+DB_POOL_WAIT = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for (or opening) a pooled database connection.",
+)
+QR_RENDER_DURATION = registry.histogram(
+    "qr_render_seconds", "Time to render an uncached QR code, pool queueing included.", ("format",),
+)
+
+_in_flight = 0
+
+
+@registry.callback("http_requests_in_flight", "Requests currently being served.")
+def _collect_in_flight():
+    return [((), _in_flight)]
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    """
+    Time every HTTP request into REQUEST_DURATION.
+
+    Requests are labelled with the route template (e.g. /api/v1/foods/{food_id}),
+    read from the scope once routing has happened, so label sets stay bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS:
+            await self.app(scope, receive, send)
+            return
+
+        global _in_flight
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        _in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _in_flight -= 1
+            route = scope.get("route")
+            REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status),
+            )
@@ -0,0 +1,115 @@
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Deque, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class PoolSaturated(RuntimeError):
+    """Raised when a bounded pool already has as much work as it will queue."""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"{name} pool is saturated, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class BoundedProcessPool:
+    """
+    Process pool for CPU-bound work with a hard cap on queued jobs.
+
+    Running the work in other processes keeps it from holding the GIL while
+    request threads serve database-bound handlers. Once workers + max_pending
+    jobs are in flight, new jobs are rejected with PoolSaturated instead of
+    queueing without bound. With workers=0 jobs run inline in the caller.
+    """
+
+    def __init__(self, name: str, workers: int, max_pending: int, retry_after: int = 1):
+        self.name = name
+        self.workers = workers
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+
+    def run(self, func: Callable[..., T], *args) -> T:
+        """Run func(*args) in the pool and wait for the result."""
+        if self.workers <= 0:
+            return func(*args)
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PoolSaturated(self.name, self.retry_after)
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        return self._result(future)
+
+    def map(self, func: Callable[..., T], jobs: Iterable[tuple]) -> Iterator[T]:
+        """
+        Run func over argument tuples, yielding results in submission order.
+
+        Meant for batch work: it keeps one job per worker in flight and waits
+        for a free slot instead of raising PoolSaturated, so a large batch
+        shares the pool with interactive requests rather than filling it.
+        """
+        if self.workers <= 0:
+            for args in jobs:
+                yield func(*args)
+            return
+
+        pending: Deque[Future] = deque()
+        try:
+            for args in jobs:
+                if len(pending) >= self.workers:
+                    yield self._result(pending.popleft())
+                self._slots.acquire()
+                try:
+                    pending.append(self._get_executor().submit(func, *args))
+                except BaseException:
+                    self._slots.release()
+                    raise
+            while pending:
+                yield self._result(pending.popleft())
+        finally:
+            # The consumer stopped early (e.g. the client disconnected)
+            for future in pending:
+                future.cancel()
+                self._slots.release()
+
+    def _result(self, future: Future):
+        """Wait for a submitted job and free its slot."""
+        try:
+            result = future.result()
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next job
+            self.shutdown()
+            raise
+        finally:
+            self._slots.release()
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; they are started again on the next job."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn rather than fork: forking a threaded server can copy held locks
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
@@ -0,0 +1,162 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+from urllib.parse import parse_qsl
+from fastapi.concurrency import run_in_threadpool
+from .admin import is_admin_token
+
+# Samples whose innermost frame is one of these are threads waiting for work
+IDLE_FRAMES = {("threading.py", "wait"), ("selectors.py", "select"), ("queue.py", "get")}
+
+# Per-request profiles are short, so they sample more often
+REQUEST_PROFILE_INTERVAL = 0.001
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is requested while another one runs."""
+
+
+def _label(code) -> str:
+    path = code.co_filename.replace(os.sep, "/").split("/")
+    where = "/".join(path[-2:])
+    return f"{code.co_name} ({where}:{code.co_firstlineno})".replace(";", ",")
+
+
+class Sampler(threading.Thread):
+    """
+    Statistical profiler: samples every thread's stack with sys._current_frames().
+
+    Stacks are counted whole, root first, with the thread name as the root,
+    so they can be written out as collapsed stacks for flamegraph.pl or
+    speedscope. Nothing runs unless a Sampler is started.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, interval: float = 0.005, idle: bool = False):
+        super().__init__(name="sampling-profiler", daemon=True)
+        self.interval = interval
+        self.idle = idle
+        self.samples: Counter = Counter()
+        self.ticks = 0
+        self._done = threading.Event()
+        self._labels: Dict[object, str] = {}
+
+    @classmethod
+    def begin(cls, interval: float = 0.005, idle: bool = False) -> "Sampler":
+        """Start sampling; one profile runs at a time, others get ProfilerBusy."""
+        if not cls._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+        sampler = cls(interval, idle)
+        sampler.start()
+        return sampler
+
+    def end(self) -> Counter:
+        """Stop sampling and return the counted stacks; blocks for up to one interval."""
+        self._done.set()
+        self.join()
+        type(self)._lock.release()
+        return self.samples
+
+    def run(self) -> None:
+        own = threading.get_ident()
+        while not self._done.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    self._sample(names.get(ident, str(ident)), frame)
+            self.ticks += 1
+
+    def _sample(self, thread: str, frame) -> None:
+        code = frame.f_code
+        if not self.idle and (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+            return
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = _label(code)
+            stack.append(label)
+            frame = frame.f_back
+        stack.append(thread.replace(";", ","))
+        self.samples[tuple(reversed(stack))] += 1
+
+
+def collapsed(samples: Counter) -> str:
+    """Brendan Gregg's collapsed stack format: "root;caller;callee count" per line."""
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in sorted(samples.items()))
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ProfilerMiddleware:
+    """
+    Profile a single request with ?profile=1 and a valid X-Admin-Token.
+
+    The request runs as usual while every thread is sampled; its response is
+    replaced by the collapsed stacks, with the original status in
+    X-Profiled-Status. Without the token the parameter is ignored.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or b"profile=" not in scope["query_string"]
+            or dict(parse_qsl(scope["query_string"].decode("latin-1"))).get("profile") != "1"
+            or not is_admin_token(_header(scope, b"x-admin-token"))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            sampler = Sampler.begin(REQUEST_PROFILE_INTERVAL)
+        except ProfilerBusy as e:
+            await _respond(send, 409, json.dumps({"detail": str(e)}).encode(), [], b"application/json")
+            return
+
+        status = 500
+
+        async def capture(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            samples = await run_in_threadpool(sampler.end)
+        elapsed = time.perf_counter() - start
+        await _respond(send, 200, collapsed(samples).encode(), [
+            (b"x-profiled-status", str(status).encode()),
+            (b"x-profile-samples", str(sampler.ticks).encode()),
+            (b"server-timing", f"total;dur={elapsed * 1000:.1f}".encode()),
+        ])
+
+
+async def _respond(
+    send, status: int, body: bytes, headers: list, content_type: bytes = b"text/plain; charset=utf-8"
+) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", content_type),
+            (b"content-length", str(len(body)).encode()),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,148 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """SQL queries run, and time spent running them, during one request or block."""
+
+    def __init__(self, parent: Optional["QueryStats"] = None, label: Optional[str] = None):
+        self.parent = parent
+        self.label = label if label is not None or parent is None else parent.label
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        """Count a query here and in every enclosing block."""
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.duration += duration
+            stats.statements[statement] += 1
+            stats = stats.parent
+
+    def repeated(self, times: int) -> List[Tuple[str, int]]:
+        """Statements run at least `times` times: usually a query inside a loop (N+1)."""
+        return [(statement, n) for statement, n in self.statements.most_common() if n >= times]
+
+    def server_timing(self) -> str:
+        noun = "query" if self.count == 1 else "queries"
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} {noun}"'
+
+
+# Set per request by QueryStatsMiddleware; the threadpool copies it into sync routes
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    """The innermost QueryStats counting queries here, if any."""
+    return _current.get()
+
+
+@contextmanager
+def track_queries(label: Optional[str] = None) -> Iterator[QueryStats]:
+    """Count the queries run in this context (and the threads it starts) until the block exits."""
+    stats = QueryStats(_current.get(), label)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def assert_max_queries(n: int) -> Iterator[QueryStats]:
+    """
+    Fail with AssertionError if the block runs more than n queries.
+
+        with assert_max_queries(4):
+            client.post("/api/v1/orders/", json=order)
+    """
+    with track_queries() as stats:
+        yield stats
+    if stats.count > n:
+        listing = "\n".join(f"  {times}x {statement}" for statement, times in stats.statements.most_common())
+        raise AssertionError(f"Expected at most {n} queries, ran {stats.count}:\n{listing}")
+
+
+# Called as observer(conn, statement, parameters, executemany, duration) after every statement
+_observers: List[Callable] = []
+
+
+def observe_queries(observer: Callable) -> None:
+    """Also hand every timed statement to observer (e.g. the slow-query log)."""
+    _observers.append(observer)
+
+
+def instrument_queries(engine: Engine) -> None:
+    """Time every statement the engine runs into the current QueryStats, if any, and the observers."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_start"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, duration)
+        for observer in _observers:
+            observer(conn, statement, parameters, executemany, duration)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        # A failed statement never reaches after_cursor_execute; drop its start time
+        started = context.connection.info.get("query_start") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+class QueryStatsMiddleware:
+    """
+    Count each request's queries and database time.
+
+    They are reported in a Server-Timing header (visible in browser dev
+    tools) and logged as warnings past QUERY_COUNT_WARN queries or
+    QUERY_TIME_WARN_MS, or when one statement runs N_PLUS_ONE_THRESHOLD
+    times. Batch sub-requests are counted on their own and in the batch.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(f"{scope['method']} {scope['path']}") as stats:
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start" and settings.SERVER_TIMING:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", stats.server_timing().encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                _warn(stats)
+
+
+def _warn(stats: QueryStats) -> None:
+    request = stats.label
+    milliseconds = stats.duration * 1000
+    if stats.count > settings.QUERY_COUNT_WARN or milliseconds > settings.QUERY_TIME_WARN_MS:
+        logger.warning("%s ran %d queries in %.1f ms", request, stats.count, milliseconds)
+    for statement, times in stats.repeated(settings.N_PLUS_ONE_THRESHOLD):
+        logger.warning("%s ran the same query %d times (N+1?): %s", request, times, " ".join(statement.split()))
@@ -0,0 +1,105 @@
+import json
+from datetime import date, datetime
+from typing import Callable, Iterable, Optional, Sequence, Tuple
+from fastapi import HTTPException, Query
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder produces the same JSON, only slower
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dump_json(value) -> bytes:
+    """Serialize plain Python data (dicts, lists, datetimes, str enums) to compact JSON."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+
+
+def dump_rows(columns: Sequence[str], rows: Iterable[tuple]) -> bytes:
+    """
+    Serialize row tuples as a JSON array of objects keyed by columns.
+
+    Meant for list endpoints that select exactly their response fields:
+    the rows are never turned into ORM objects or pydantic models.
+    """
+    return dump_json([dict(zip(columns, row)) for row in rows])
+
+
+def dump_rows_by_id(columns: Sequence[str], rows: Iterable[tuple], ids: Sequence[int], not_found: str) -> bytes:
+    """
+    Serialize rows as a JSON array in the order of the requested ids.
+
+    An id without a row gets {"id": id, "detail": not_found} in its place.
+    """
+    position = list(columns).index("id")
+    found = {row[position]: dict(zip(columns, row)) for row in rows}
+    return dump_json([found.get(id_) or {"id": id_, "detail": not_found} for id_ in ids])
+
+
+def select_fields(requested: Optional[str], available: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Parse a comma-separated ?fields= value against a response schema's fields.
+
+    Returns the fields in schema order, always including "id"; all of them
+    when nothing was requested. Raises ValueError for unknown fields.
+    """
+    if not requested:
+        return tuple(available)
+    names = {name.strip() for name in requested.split(",") if name.strip()}
+    unknown = names.difference(available)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    names.add("id")
+    return tuple(name for name in available if name in names)
+
+
+def fields_param(available: Sequence[str]) -> Callable[..., Optional[Tuple[str, ...]]]:
+    """
+    Build a dependency for a ?fields= query parameter.
+
+    It resolves to the selected fields, or None when the parameter is absent;
+    unknown fields are rejected with 400.
+    """
+    def dependency(
+        fields: Optional[str] = Query(
+            None, description=f"Comma-separated subset of: {', '.join(available)}"
+        )
+    ) -> Optional[Tuple[str, ...]]:
+        if fields is None:
+            return None
+        try:
+            return select_fields(fields, available)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    return dependency
+
+
+def ids_param(max_ids: int = 100) -> Callable[..., Optional[Tuple[int, ...]]]:
+    """
+    Build a dependency for an ?ids=1,2,3 multi-get query parameter.
+
+    It resolves to the ids in request order, or None when the parameter is
+    absent; malformed lists and more than max_ids ids are rejected with 400.
+    """
+    def dependency(
+        ids: Optional[str] = Query(None, description=f"Comma-separated ids to fetch, at most {max_ids}")
+    ) -> Optional[Tuple[int, ...]]:
+        if ids is None:
+            return None
+        try:
+            parsed = tuple(int(id_) for id_ in ids.split(","))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+        if len(parsed) > max_ids:
+            raise HTTPException(status_code=400, detail=f"At most {max_ids} ids can be fetched at once")
+        return parsed
+    
+    return dependency
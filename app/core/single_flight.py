@@ -0,0 +1,96 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple, TypeVar
+from fastapi import Request
+from .cache import caches_bypassed
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls into one.
+
+    The first caller for a key runs the function; callers arriving while it
+    runs wait for its result (or exception) instead of repeating the work.
+    With a ttl the result is also handed to callers arriving up to ttl
+    seconds later. Results are shared between requests, so they must be
+    immutable values such as serialized bodies, never ORM objects. Calls
+    inside a batch (see bypass_caches) always run on their own.
+    """
+
+    def __init__(self, max_results: int = 1024):
+        self.max_results = max_results
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self._results: Dict[Hashable, Tuple[float, Any]] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, func: Callable[[], T], ttl: float = 0.0) -> T:
+        """Get func()'s result for key, running it only if no identical call is in flight."""
+        if not self.enabled or caches_bypassed():
+            return func()
+
+        with self._lock:
+            held = self._results.get(key)
+            if held is not None and held[0] > time.monotonic():
+                self.shared += 1
+                return held[1]
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = func()
+        except BaseException as e:
+            with self._lock:
+                del self._calls[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._calls[key]
+            if ttl > 0:
+                self._hold(key, value, ttl)
+        future.set_result(value)
+        return value
+
+    def clear(self) -> None:
+        """Drop held results; calls in flight are unaffected."""
+        with self._lock:
+            self._results.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "held": len(self._results),
+                "executed": self.executed,
+                "shared": self.shared,
+            }
+
+    def _hold(self, key: Hashable, value: Any, ttl: float) -> None:
+        now = time.monotonic()
+        if len(self._results) >= self.max_results:
+            self._results = {k: held for k, held in self._results.items() if held[0] > now}
+            while len(self._results) >= self.max_results:
+                self._results.pop(next(iter(self._results)))
+        self._results[key] = (now + ttl, value)
+
+
+def request_key(request: Request) -> tuple:
+    """Key a read by its route and query parameters; parameter order does not matter."""
+    return (request.method, request.url.path, tuple(sorted(request.query_params.multi_items())))
+
+
+# Shared by the hot read endpoints (menu, active promotions, payment statistics)
+read_coalescer = SingleFlight()
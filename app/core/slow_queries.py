@@ -0,0 +1,121 @@
+import json
+import queue
+import re
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy.engine import Engine
+from .config import settings
+from .query_stats import current_stats, observe_queries
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def normalize_sql(statement: str) -> str:
+    """One line, literals replaced by ?, and IN lists of any length folded to (?...)."""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _NUMBER.sub("?", _STRING.sub("?", statement))
+    return _PLACEHOLDER_LIST.sub("(?...)", statement)
+
+
+def parameters_shape(parameters, executemany: bool) -> str:
+    """Describe bound parameters by type only, e.g. "(int, str)" or "25 x (str, float)"; values are never kept."""
+    if executemany:
+        rows = list(parameters)
+        return f"{len(rows)} x {parameters_shape(rows[0], False)}" if rows else "0 x ()"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{name}: {type(value).__name__}" for name, value in parameters.items()) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in parameters or ()) + ")"
+
+
+class SlowQueryLog:
+    """
+    Statements slower than SLOW_QUERY_MS, with their query plans.
+
+    The hot path only times statements and queues the slow ones; a
+    background thread runs EXPLAIN (QUERY PLAN on SQLite) on its own
+    connection, keeps the newest SLOW_QUERY_LOG_SIZE records in memory and,
+    with SLOW_QUERY_LOG_FILE set, appends each as a JSON line. When the
+    queue is full, records are dropped rather than slowing requests down.
+    """
+
+    def __init__(self, size: int = 100, path: Optional[str] = None):
+        self.path = path
+        self.dropped = 0
+        self._records = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=size)
+        self._engine: Optional[Engine] = None
+        self._worker: Optional[threading.Thread] = None
+
+    def install(self, engine: Engine) -> None:
+        """Watch the statements of an engine instrumented with instrument_queries()."""
+        self._engine = engine
+        observe_queries(self._observe)
+
+    def records(self, limit: Optional[int] = None) -> List[dict]:
+        """The logged slow queries, newest first."""
+        with self._lock:
+            records = list(reversed(self._records))
+        return records[:limit] if limit is not None else records
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+    def _observe(self, conn, statement: str, parameters, executemany: bool, duration: float) -> None:
+        if duration * 1000 >= settings.SLOW_QUERY_MS and not conn.info.get("explaining"):
+            self._submit(statement, parameters, executemany, duration)
+
+    def _submit(self, statement: str, parameters, executemany: bool, duration: float) -> None:
+        stats = current_stats()
+        record = {
+            "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "duration_ms": round(duration * 1000, 3),
+            "request": stats.label if stats is not None else None,
+            "statement": normalize_sql(statement),
+            "parameters": parameters_shape(parameters, executemany),
+        }
+        # The plan needs real values; take the first row of an executemany
+        explain_parameters = (list(parameters)[:1] or [()])[0] if executemany else parameters
+        try:
+            self._queue.put_nowait((record, statement, explain_parameters))
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="slow-query-log", daemon=True)
+                    self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            record, statement, parameters = self._queue.get()
+            record["plan"] = self._explain(statement, parameters)
+            with self._lock:
+                self._records.append(record)
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+
+    def _explain(self, statement: str, parameters) -> Optional[List[str]]:
+        prefix = "EXPLAIN QUERY PLAN " if self._engine.dialect.name == "sqlite" else "EXPLAIN "
+        try:
+            with self._engine.connect() as connection:
+                connection.info["explaining"] = True
+                try:
+                    rows = connection.exec_driver_sql(prefix + statement, parameters).fetchall()
+                finally:
+                    connection.info.pop("explaining", None)
+        except Exception as e:
+            return [f"EXPLAIN failed: {e}"]
+        # SQLite rows are (id, parent, notused, detail)
+        return [str(row[-1]) for row in rows]
+
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_LOG_SIZE, settings.SLOW_QUERY_LOG_FILE)
@@ -0,0 +1,143 @@
+"""HTML page templates compiled once, and static assets served from memory."""
+import gzip
+import html
+import os
+import threading
+from string import Template
+from typing import Dict, Optional, Tuple
+from .http_cache import make_etag
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip variants are kept
+    brotli = None
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_DIR = os.path.join(APP_DIR, "templates")
+STATIC_DIR = os.path.join(APP_DIR, "static")
+STATIC_URL = "/static"
+
+ASSET_MEDIA_TYPES = {".css": "text/css", ".js": "application/javascript", ".svg": "image/svg+xml"}
+
+
+class Markup(str):
+    """Trusted HTML that is inserted into a template without escaping."""
+
+
+class _PageSyntax(Template):
+    # Only $name placeholders: lone "$" (prices) and "${...}" (inline JS) stay literal
+    pattern = r"""
+    \$(?:
+        (?P<escaped>(?!)) |
+        (?P<named>[_a-z][_a-z0-9]*) |
+        (?P<braced>(?!)) |
+        (?P<invalid>(?!))
+    )
+    """
+
+
+class StaticAsset:
+    """A file from app/static held in memory with its ETag and a versioned URL."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(STATIC_DIR, path), "rb") as f:
+            self.content = f.read()
+        self.media_type = ASSET_MEDIA_TYPES.get(os.path.splitext(path)[1], "application/octet-stream")
+        self.etag = make_etag(self.content)
+        # The version changes with the content, so the URL can be cached as immutable
+        self.version = self.etag.strip('"')[:12]
+        self.url = f"{STATIC_URL}/{path}?v={self.version}"
+
+
+class PageTemplate:
+    """
+    An HTML template from app/templates, parsed once.
+
+    Values are HTML-escaped unless wrapped in Markup; "stylesheet" is filled
+    in with the versioned URL of the page's CSS asset.
+    """
+
+    def __init__(self, name: str, stylesheet: Optional[str] = None):
+        with open(os.path.join(TEMPLATE_DIR, name), encoding="utf-8") as f:
+            self._template = _PageSyntax(f.read())
+        self._defaults = {}
+        if stylesheet:
+            self._defaults["stylesheet"] = get_asset(stylesheet).url
+
+    def render(self, **values) -> bytes:
+        """Fill in the template and encode it as UTF-8."""
+        escaped = {
+            key: value if isinstance(value, Markup) else html.escape(str(value))
+            for key, value in values.items()
+        }
+        return self._template.substitute(self._defaults, **escaped).encode()
+
+
+class StaticPage:
+    """A template with no per-request values, rendered once to bytes."""
+
+    def __init__(self, name: str, stylesheet: Optional[str] = None):
+        self.content = PageTemplate(name, stylesheet).render()
+        self.etag = make_etag(self.content)
+
+
+class CompressedFile:
+    """
+    A file held in memory with precompressed variants, each with its own ETag.
+
+    Variants are built once: gzip always, brotli when the brotli package is
+    installed. With reload=True the file's mtime is checked on every access
+    and the variants are rebuilt after it changes (for development).
+    """
+
+    def __init__(self, path: str, reload: bool = False):
+        self.path = path
+        self.reload = reload
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._variants: Dict[str, Tuple[bytes, str]] = {}
+        self._load()
+
+    @property
+    def encodings(self) -> Tuple[str, ...]:
+        """Available codings, most preferred first."""
+        return ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def variant(self, encoding: str) -> Tuple[bytes, str]:
+        """Get (content, etag) for "br", "gzip" or "identity"."""
+        if self.reload and os.stat(self.path).st_mtime_ns != self._mtime:
+            self._load()
+        return self._variants[encoding]
+
+    def _load(self) -> None:
+        with self._lock:
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime == self._mtime:
+                return
+            with open(self.path, "rb") as f:
+                content = f.read()
+            etag = make_etag(content).strip('"')
+            variants = {"identity": (content, f'"{etag}"')}
+            variants["gzip"] = (gzip.compress(content, 9, mtime=0), f'"{etag}-gzip"')
+            if brotli is not None:
+                variants["br"] = (brotli.compress(content, quality=11), f'"{etag}-br"')
+            self._variants, self._mtime = variants, mtime
+
+
+def _load_assets() -> Dict[str, StaticAsset]:
+    assets = {}
+    for root, _, files in os.walk(STATIC_DIR):
+        for filename in files:
+            path = os.path.relpath(os.path.join(root, filename), STATIC_DIR).replace(os.sep, "/")
+            assets[path] = StaticAsset(path)
+    return assets
+
+
+# Every static file is read once at import; requests never touch the disk
+assets = _load_assets()
+
+
+def get_asset(path: str) -> Optional[StaticAsset]:
+    """Get a static asset by its path under app/static."""
+    return assets.get(path)
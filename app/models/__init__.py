@@ -1,6 +1,7 @@
 from .food import Food
+from .food_change import FoodChange
 from .order import Order
 from .payment import Payment, PaymentMethodEnum, PaymentStatusEnum
 from .promotion import Promotion
 
-__all__ = ["Food", "Order", "Payment", "PaymentMethodEnum", "PaymentStatusEnum", "Promotion"]
+__all__ = ["Food", "FoodChange", "Order", "Payment", "PaymentMethodEnum", "PaymentStatusEnum", "Promotion"]
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, Boolean, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class FoodChange(Base):
+    """Latest change to each food, maintained by database triggers for delta sync."""
+    
+    __tablename__ = "food_changes"
+    
+    food_id = Column(Integer, primary_key=True)
+    seq = Column(Integer, unique=True, index=True, nullable=False)  # monotonic change sequence
+    deleted = Column(Boolean, default=False, nullable=False)  # tombstone
+    changed_at = Column(DateTime, server_default=func.now())
+    
+    def __repr__(self):
+        return f"<FoodChange(food_id={self.food_id}, seq={self.seq}, deleted={self.deleted})>"
@@ -1,7 +1,25 @@
+from collections import defaultdict
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from app.models import Food
-from typing import List, Optional
+from sqlalchemy import and_, case, func, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.core.cache import catalog_cache
+from app.core.database import after_commit
+from app.core.events import food_events
+from app.core.fts import (
+    FOOD_FTS_CANDIDATE_COLUMNS, FOOD_FTS_CANDIDATES, FOOD_FTS_SCORE, build_match_query, column_match
+)
+from app.models import Food, FoodChange
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Placeholders for required columns when an upsert row only updates an existing food
+_UPSERT_FILLER = {"price": 0.0, "category": ""}
+
+# Fields included in change events
+_EVENT_FIELDS = ("name", "description", "price", "category", "stock")
+
+
+def _event_fields(food: Food) -> dict:
+    return {"id": food.id, **{field: getattr(food, field) for field in _EVENT_FIELDS}}
 
 
 class FoodRepository:
@@ -15,7 +33,9 @@ class FoodRepository:
         food = Food(**food_data)
         self.db.add(food)
         self.db.commit()
+        after_commit(catalog_cache.invalidate)
         self.db.refresh(food)
+        after_commit(food_events.publish, "food.created", _event_fields(food))
         return food
     
     def get_by_id(self, food_id: int) -> Optional[Food]:
@@ -30,22 +50,155 @@ class FoodRepository:
         """Get all food items with pagination."""
         return self.db.query(Food).offset(skip).limit(limit).all()
     
+    def get_rows(self, columns: Sequence[str], skip: int = 0, limit: Optional[int] = 100, **filters) -> list:
+        """Get only the given columns of matching foods as row tuples."""
+        query = self.db.query(*(getattr(Food, column) for column in columns)).filter_by(**filters)
+        # Order explicitly: a covering index on the selected columns would otherwise set the row order
+        return query.order_by(Food.id).offset(skip).limit(limit).all()
+    
+    def get_rows_by_ids(self, columns: Sequence[str], ids: Iterable[int]) -> list:
+        """Get only the given columns of the foods with the given IDs, in one IN query."""
+        query = self.db.query(*(getattr(Food, column) for column in columns))
+        return query.filter(Food.id.in_(set(ids))).order_by(Food.id).all()
+    
+    def count(self) -> int:
+        """Count all foods."""
+        return self.db.query(func.count(Food.id)).scalar()
+    
+    def get_labels(self) -> list:
+        """Get (id, name, price) for every food, grouped by category."""
+        return (
+            self.db.query(Food.id, Food.name, Food.price)
+            .order_by(Food.category, Food.name, Food.id)
+            .all()
+        )
+    
+    def get_import_state(self, names: List[str]) -> Dict[str, tuple]:
+        """Get the importable columns of existing foods, keyed by name."""
+        rows = self.db.query(
+            Food.name, Food.description, Food.price, Food.category, Food.stock
+        ).filter(Food.name.in_(names)).all()
+        return {row.name: row for row in rows}
+    
+    def upsert_many(self, rows: List[dict]) -> None:
+        """Insert foods or update them by name, one statement per set of supplied columns."""
+        groups = defaultdict(list)
+        for row in rows:
+            groups[tuple(sorted(row))].append(row)
+        
+        for columns, group in groups.items():
+            statement = sqlite_insert(Food)
+            updates = {column: statement.excluded[column] for column in columns if column != "name"}
+            updates["updated_at"] = func.now()
+            
+            # SQLite checks NOT NULL before resolving the conflict, so rows that
+            # only update existing foods need filler values for required columns.
+            # The filler is never stored: the conflict branch only sets supplied columns.
+            filler = {column: value for column, value in _UPSERT_FILLER.items() if column not in columns}
+            if filler:
+                group = [{**filler, **row} for row in group]
+            
+            self.db.execute(
+                statement.on_conflict_do_update(index_elements=[Food.name], set_=updates),
+                group,
+            )
+        
+        self.db.commit()
+        after_commit(catalog_cache.invalidate)
+        after_commit(food_events.publish, "catalog.changed", {"count": len(rows)})
+    
     def get_by_category(self, category: str, skip: int = 0, limit: int = 100) -> List[Food]:
         """Get food items by category."""
         return self.db.query(Food).filter(Food.category == category).offset(skip).limit(limit).all()
     
+    def get_category_facets(self) -> list:
+        """Get item count, in-stock count and price range per category."""
+        return (
+            self.db.query(
+                Food.category,
+                func.count(Food.id),
+                func.sum(case((Food.stock > 0, 1), else_=0)),
+                func.min(Food.price),
+                func.max(Food.price),
+            )
+            .group_by(Food.category)
+            .order_by(Food.category)
+            .all()
+        )
+    
+    def get_changes(self, since: int, limit: int = 500) -> List[Tuple[FoodChange, Optional[Food]]]:
+        """Get foods changed after a change sequence number, oldest change first; deleted foods come back as None."""
+        return (
+            self.db.query(FoodChange, Food)
+            .outerjoin(Food, Food.id == FoodChange.food_id)
+            .filter(FoodChange.seq > since)
+            .order_by(FoodChange.seq)
+            .limit(limit)
+            .all()
+        )
+    
+    def get_last_change_seq(self) -> int:
+        """Get the latest change sequence number."""
+        return self.db.query(func.max(FoodChange.seq)).scalar() or 0
+    
+    def search(
+        self, query: str, skip: int = 0, limit: int = 20, columns: Optional[Sequence[str]] = None
+    ) -> list:
+        """
+        Full-text search over name, description and category, best matches first.
+        
+        Returns Food objects, or row tuples of just the given columns.
+        """
+        match = build_match_query(query)
+        if not match:
+            return []
+        
+        # columns are model attribute names, never user input
+        selected = ", ".join(f"foods.{column}" for column in columns) if columns else "foods.*"
+        # Only the candidates are ranked (see FOOD_FTS_CANDIDATES); their rowid
+        # range lets FTS5 skip the matches outside it, and only the requested
+        # page is joined to foods
+        tiers = {f"match_{column}": column_match(match, column) for column in FOOD_FTS_CANDIDATE_COLUMNS}
+        tiers["match"] = match
+        candidates = " UNION ".join(
+            f"SELECT rowid FROM (SELECT rowid FROM foods_fts WHERE foods_fts MATCH :{tier} LIMIT :candidates)"
+            for tier in tiers
+        )
+        statement = text(
+            f"WITH candidates(id) AS ({candidates}) "
+            f"SELECT {selected} FROM ("
+            f"    SELECT rowid, {FOOD_FTS_SCORE} AS score FROM foods_fts WHERE foods_fts MATCH :match "
+            "    AND rowid >= (SELECT min(id) FROM candidates) AND rowid <= (SELECT max(id) FROM candidates) "
+            "    AND +rowid IN candidates "
+            "    ORDER BY score, rowid LIMIT :limit OFFSET :skip"
+            ") AS hits JOIN foods ON foods.id = hits.rowid "
+            "ORDER BY hits.score, hits.rowid"
+        )
+        # Deep pages widen the candidate set so they are never cut short
+        params = dict(tiers, candidates=max(FOOD_FTS_CANDIDATES, skip + limit), limit=limit, skip=skip)
+        if columns:
+            typed = statement.columns(*(getattr(Food, column) for column in columns))
+            return self.db.execute(typed, params).all()
+        return self.db.query(Food).from_statement(statement).params(**params).all()
+    
     def update(self, food_id: int, food_data: dict) -> Optional[Food]:
         """Update a food item."""
         food = self.get_by_id(food_id)
         if not food:
             return None
         
+        changes = {}
         for key, value in food_data.items():
             if value is not None:
+                if key in _EVENT_FIELDS and getattr(food, key) != value:
+                    changes[key] = value
                 setattr(food, key, value)
         
         self.db.commit()
+        after_commit(catalog_cache.invalidate)
         self.db.refresh(food)
+        if changes:
+            after_commit(food_events.publish, "food.updated", {"id": food.id, **changes})
         return food
     
     def delete(self, food_id: int) -> bool:
@@ -56,6 +209,8 @@ class FoodRepository:
         
         self.db.delete(food)
         self.db.commit()
+        after_commit(catalog_cache.invalidate)
+        after_commit(food_events.publish, "food.deleted", {"id": food_id})
         return True
     
     def decrease_stock(self, food_id: int, quantity: int) -> Optional[Food]:
@@ -66,5 +221,7 @@ class FoodRepository:
         
         food.stock -= quantity
         self.db.commit()
+        after_commit(catalog_cache.invalidate)
         self.db.refresh(food)
+        after_commit(food_events.publish, "food.updated", {"id": food.id, "stock": food.stock})
         return food
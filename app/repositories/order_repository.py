@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from app.models import Order
-from typing import List, Optional
+from typing import Iterable, List, Optional, Sequence
 
 
 class OrderRepository:
@@ -25,6 +25,16 @@ class OrderRepository:
         """Get all orders with pagination."""
         return self.db.query(Order).offset(skip).limit(limit).all()
     
+    def get_rows(self, columns: Sequence[str], skip: int = 0, limit: Optional[int] = 100, **filters) -> list:
+        """Get only the given columns of matching orders as row tuples."""
+        query = self.db.query(*(getattr(Order, column) for column in columns)).filter_by(**filters)
+        return query.order_by(Order.id).offset(skip).limit(limit).all()
+    
+    def get_rows_by_ids(self, columns: Sequence[str], ids: Iterable[int]) -> list:
+        """Get only the given columns of the orders with the given IDs, in one IN query."""
+        query = self.db.query(*(getattr(Order, column) for column in columns))
+        return query.filter(Order.id.in_(set(ids))).order_by(Order.id).all()
+    
     def get_by_customer_email(self, email: str, skip: int = 0, limit: int = 100) -> List[Order]:
         """Get orders by customer email."""
         return self.db.query(Order).filter(Order.customer_email == email).offset(skip).limit(limit).all()
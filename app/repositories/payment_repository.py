@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from app.models.payment import Payment, PaymentStatusEnum
-from typing import List, Optional
+from typing import Iterable, List, Optional, Sequence
 
 
 class PaymentRepository:
@@ -33,6 +33,16 @@ class PaymentRepository:
         """Get all payments with pagination."""
         return self.db.query(Payment).offset(skip).limit(limit).all()
     
+    def get_rows(self, columns: Sequence[str], skip: int = 0, limit: Optional[int] = 100, **filters) -> list:
+        """Get only the given columns of matching payments as row tuples."""
+        query = self.db.query(*(getattr(Payment, column) for column in columns)).filter_by(**filters)
+        return query.order_by(Payment.id).offset(skip).limit(limit).all()
+    
+    def get_rows_by_ids(self, columns: Sequence[str], ids: Iterable[int]) -> list:
+        """Get only the given columns of the payments with the given IDs, in one IN query."""
+        query = self.db.query(*(getattr(Payment, column) for column in columns))
+        return query.filter(Payment.id.in_(set(ids))).order_by(Payment.id).all()
+    
     def get_by_status(self, status: str, skip: int = 0, limit: int = 100) -> List[Payment]:
         """Get payments by status."""
         return self.db.query(Payment).filter(Payment.status == status).offset(skip).limit(limit).all()
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from app.models.promotion import Promotion
 from app.schemas.promotion import PromotionCreate, PromotionUpdate
 from datetime import datetime
+from typing import Optional, Sequence
 
 
 class PromotionRepository:
@@ -56,6 +57,12 @@ class PromotionRepository:
         
         return query.offset(skip).limit(limit).all()
 
+    @staticmethod
+    def get_rows(db: Session, columns: Sequence[str], skip: int = 0, limit: Optional[int] = 100, **filters) -> list:
+        """Get only the given columns of matching promotions as row tuples."""
+        query = db.query(*(getattr(Promotion, column) for column in columns)).filter_by(**filters)
+        return query.order_by(Promotion.id).offset(skip).limit(limit).all()
+
     @staticmethod
     def update(db: Session, promotion_id: int, promotion_data: PromotionUpdate) -> Promotion:
         """Update a promotion."""
@@ -1,4 +1,6 @@
 from fastapi import APIRouter
+from .admin import router as admin_router
+from .batch import router as batch_router
 from .food import router as food_router
 from .order import router as order_router
 from .payment import router as payment_router
@@ -12,5 +14,7 @@ api_router.include_router(order_router, prefix="/orders", tags=["orders"])
 api_router.include_router(payment_router, prefix="/payments", tags=["payments"])
 api_router.include_router(promotion_router, prefix="/promotions", tags=["promotions"])
 api_router.include_router(qr_code_router, prefix="/qr", tags=["qr-codes"])
+api_router.include_router(batch_router, prefix="/batch", tags=["batch"])
+api_router.include_router(admin_router, prefix="/admin", tags=["admin"])
 
 __all__ = ["api_router"]
@@ -0,0 +1,56 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from app.core.admin import require_admin
+from app.core.config import settings
+from app.core.profiler import ProfilerBusy, Sampler, collapsed
+from app.core.slow_queries import slow_query_log
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/slow-queries")
+def get_slow_queries(limit: int = Query(100, ge=1, le=1000)):
+    """
+    Statements slower than SLOW_QUERY_MS, newest first.
+
+    Each has its normalized SQL, parameter types (never values), duration,
+    the request that ran it and its query plan.
+    """
+    return {
+        "threshold_ms": settings.SLOW_QUERY_MS,
+        "dropped": slow_query_log.dropped,
+        "queries": slow_query_log.records(limit),
+    }
+
+
+@router.delete("/slow-queries", status_code=204)
+def clear_slow_queries():
+    """Empty the in-memory slow-query log (the JSON lines file is kept)."""
+    slow_query_log.clear()
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10, gt=0, le=120),
+    interval_ms: float = Query(5, ge=1, le=100),
+    idle: bool = Query(False, description="Keep samples of threads waiting for work"),
+):
+    """
+    Sample the stacks of every thread in this worker for `seconds`.
+
+    Returns collapsed stacks ("thread;caller;callee count" lines), ready for
+    flamegraph.pl or https://www.speedscope.app. One profile runs at a time.
+    Each server process profiles only itself.
+    """
+    try:
+        sampler = Sampler.begin(interval_ms / 1000, idle)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        # Joining the sampler thread waits up to one interval: keep it off the event loop
+        samples = await run_in_threadpool(sampler.end)
+    return PlainTextResponse(collapsed(samples), headers={"X-Profile-Samples": str(sampler.ticks)})
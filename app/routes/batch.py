@@ -0,0 +1,128 @@
+import asyncio
+import json
+from typing import List, Optional
+from fastapi import APIRouter, Request
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import shared_session
+from app.schemas import BatchOperation, BatchRequest, BatchResult, BatchResponse
+
+router = APIRouter()
+
+# Calls that cannot run inside a batch: batches do not nest, and streams never end
+UNBATCHABLE_PATHS = {"/batch", "/foods/stream"}
+
+# Reported for operations skipped after an atomic batch failed
+FAILED_DEPENDENCY = 424
+
+
+class _RollBack(Exception):
+    """Raised inside an atomic batch to undo everything done so far."""
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(batch: BatchRequest, request: Request):
+    """
+    Run many API calls in one request.
+
+    Operations run in order, in-process, and share one database session.
+    Paths are relative to the API root, e.g. {"method": "GET", "path": "/foods/1"}.
+    Otherwise calls fail independently: a failing call's pending work is
+    rolled back and the next call starts clean. With atomic=true the batch
+    stops at the first failing call (status >= 400) and every change made by
+    earlier calls is rolled back; the remaining calls are reported as 424.
+    """
+    results: List[BatchResult] = []
+    committed = True
+    try:
+        with shared_session(batch.atomic) as session:
+            for index, operation in enumerate(batch.operations):
+                result = await _dispatch(request, operation)
+                results.append(result)
+                if result.status < 400:
+                    continue
+                if not batch.atomic:
+                    # e.g. a failed commit leaves the shared session unusable until rolled back
+                    await run_in_threadpool(session.rollback)
+                    continue
+                skipped = len(batch.operations) - index - 1
+                results.extend(BatchResult(status=FAILED_DEPENDENCY) for _ in range(skipped))
+                raise _RollBack()
+    except _RollBack:
+        # Cache invalidation and change events were held until commit, so they are just dropped
+        committed = False
+    return BatchResponse(committed=committed, results=results)
+
+
+async def _dispatch(request: Request, operation: BatchOperation) -> BatchResult:
+    """Call the app directly with an ASGI scope built for the operation."""
+    path, _, query = operation.path.partition("?")
+    if path.rstrip("/") in UNBATCHABLE_PATHS:
+        return BatchResult(status=400, body={"detail": f"{path} cannot be batched"})
+
+    body = b"" if operation.body is None else json.dumps(operation.body).encode()
+    full_path = settings.API_V1_STR + path
+    scope = {
+        "type": "http",
+        "batched": True,
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": operation.method,
+        "scheme": request.url.scheme,
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": "",
+        "path": full_path,
+        "raw_path": full_path.encode(),
+        "query_string": query.encode(),
+        "headers": [
+            (b"host", request.headers.get("host", "localhost").encode()),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    }
+
+    done = asyncio.Event()
+    sent_body = False
+    status = 500
+    chunks = []
+    content_type = ""
+
+    async def receive():
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status, content_type
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            headers = dict(message.get("headers", []))
+            content_type = headers.get(b"content-type", b"").decode()
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                done.set()
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # The error middleware has already sent its 500 response
+        pass
+    finally:
+        done.set()
+    return BatchResult(status=status, body=_decode(b"".join(chunks), content_type))
+
+
+def _decode(content: bytes, content_type: str) -> Optional[object]:
+    """JSON bodies are embedded as JSON, text as a string; other bodies are left out."""
+    if not content:
+        return None
+    if content_type.startswith("application/json"):
+        return json.loads(content)
+    if content_type.startswith("text/"):
+        return content.decode(errors="replace")
+    return None
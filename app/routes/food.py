@@ -1,12 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.events import RESET, Subscription, food_events
+from app.core.http_cache import cached_response, etag_matches
+from app.core.serialization import fields_param, ids_param
+from app.core.single_flight import read_coalescer, request_key
 from app.services import FoodService
-from app.schemas import FoodCreate, FoodUpdate, FoodResponse
-from typing import List
+from app.services.food_service import FOOD_FIELDS
+from app.services.catalog_import import detect_format, iter_records
+from app.schemas import FoodCreate, FoodUpdate, FoodResponse, FoodFacets, FoodImportSummary, FoodChanges
+from typing import List, Optional, Tuple
 
 router = APIRouter()
 
+food_fields = fields_param(FOOD_FIELDS)
+multi_get_ids = ids_param()
+
 
 @router.post("", response_model=FoodResponse, status_code=201)
 def create_food(
@@ -22,13 +34,123 @@ def create_food(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/bulk", response_model=FoodImportSummary)
+def bulk_import_foods(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|json)$"),
+    chunk_size: int = Query(settings.FOOD_IMPORT_CHUNK_SIZE, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """Upsert foods by name from an uploaded CSV, JSON array or JSON lines file."""
+    service = FoodService(db)
+    records = iter_records(file.file, format or detect_format(file.filename, file.content_type))
+    return service.import_foods(records, chunk_size)
+
+
+@router.get("/search", response_model=List[FoodResponse])
+def search_foods(
+    q: str = Query(..., min_length=1, max_length=100),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    fields: Optional[Tuple[str, ...]] = Depends(food_fields),
+    db: Session = Depends(get_db)
+):
+    """Search food items by name, description and category, best matches first."""
+    service = FoodService(db)
+    if fields:
+        return Response(service.search_foods_json(q, skip, limit, fields), media_type="application/json")
+    return service.search_foods(q, skip, limit)
+
+
+@router.get("/facets", response_model=FoodFacets)
+def get_food_facets(
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Get item counts, in-stock counts and price ranges per category."""
+    etag = FoodService.facets_etag()
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    
+    service = FoodService(db)
+    body, etag = service.get_facets_snapshot()
+    return cached_response(request, body, etag)
+
+
+@router.get("/changes", response_model=FoodChanges)
+def get_food_changes(
+    request: Request,
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """
+    Get foods changed since a sync cursor, with tombstones for deleted foods.
+    
+    Pass the returned cursor as `since` on the next call; keep paging while
+    has_more is true. Start from 0 for a full sync.
+    """
+    etag = FoodService.changes_etag(since, limit)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    
+    service = FoodService(db)
+    body, etag = service.get_changes_snapshot(since, limit)
+    return cached_response(request, body, etag)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_food_changes(request: Request):
+    """
+    Stream menu changes as server-sent events.
+    
+    Events are food.created, food.updated (only the changed fields, e.g. stock
+    or price), food.deleted and catalog.changed (after a bulk import). A
+    reset event means the client fell behind and should refetch the catalog.
+    """
+    last_event_id = request.headers.get("last-event-id", "")
+    subscription = food_events.subscribe(int(last_event_id) if last_event_id.isdigit() else None)
+    return StreamingResponse(
+        _event_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _event_stream(request: Request, subscription: Subscription):
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), settings.SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield b": ping\n\n"
+                continue
+            
+            if message is RESET:
+                yield b"event: reset\ndata: {}\n\n"
+                break
+            yield message
+    finally:
+        food_events.unsubscribe(subscription)
+
+
 @router.get("/{food_id}", response_model=FoodResponse)
 def get_food(
     food_id: int,
+    fields: Optional[Tuple[str, ...]] = Depends(food_fields),
     db: Session = Depends(get_db)
 ):
     """Get a food item by ID."""
     service = FoodService(db)
+    if fields:
+        body = service.get_food_json(food_id, fields)
+        if body is None:
+            raise HTTPException(status_code=404, detail="Food not found")
+        return Response(body, media_type="application/json")
+    
     food = service.get_food(food_id)
     if not food:
         raise HTTPException(status_code=404, detail="Food not found")
@@ -37,20 +159,40 @@ def get_food(
 
 @router.get("", response_model=List[FoodResponse])
 def get_all_foods(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     category: str = None,
+    ids: Optional[Tuple[int, ...]] = Depends(multi_get_ids),
+    fields: Optional[Tuple[str, ...]] = Depends(food_fields),
     db: Session = Depends(get_db)
 ):
-    """Get all food items or filter by category."""
-    service = FoodService(db)
+    """
+    Get all food items or filter by category.
+    
+    With ids, get those foods in request order instead (skip, limit and
+    category are ignored); missing ones come back as
+    {"id": ..., "detail": "Food not found"}.
+    """
+    fields = fields or FOOD_FIELDS
+    if ids:
+        etag = FoodService.foods_by_ids_etag(ids, fields)
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+        service = FoodService(db)
+        body, etag = read_coalescer.do(request_key(request), lambda: service.get_foods_by_ids(ids, fields))
+        return cached_response(request, body, etag)
     
-    if category:
-        foods = service.get_foods_by_category(category, skip, limit)
-    else:
-        foods = service.get_all_foods(skip, limit)
+    etag = FoodService.catalog_etag(skip, limit, category, fields)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
     
-    return foods
+    # Kiosks refresh the menu together: concurrent cache misses share one query
+    service = FoodService(db)
+    body, etag = read_coalescer.do(
+        request_key(request), lambda: service.get_catalog_page(skip, limit, category, fields)
+    )
+    return cached_response(request, body, etag)
 
 
 @router.put("/{food_id}", response_model=FoodResponse)
@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.serialization import fields_param, ids_param
 from app.services import OrderService
+from app.services.order_service import ORDER_FIELDS
 from app.schemas import OrderCreate, OrderUpdate, OrderResponse
-from typing import List
+from typing import List, Optional, Tuple
 
 router = APIRouter()
 
+order_fields = fields_param(ORDER_FIELDS)
+multi_get_ids = ids_param()
+
 
 @router.post("", response_model=OrderResponse, status_code=201)
 def create_order(
@@ -27,10 +33,17 @@ def create_order(
 @router.get("/{order_id}", response_model=OrderResponse)
 def get_order(
     order_id: int,
+    fields: Optional[Tuple[str, ...]] = Depends(order_fields),
     db: Session = Depends(get_db)
 ):
     """Get an order by ID."""
     service = OrderService(db)
+    if fields:
+        body = service.get_order_json(order_id, fields)
+        if body is None:
+            raise HTTPException(status_code=404, detail="Order not found")
+        return Response(body, media_type="application/json")
+    
     order = service.get_order(order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
@@ -43,21 +56,34 @@ def get_all_orders(
     limit: int = Query(100, ge=1, le=100),
     email: str = None,
     status: str = None,
+    ids: Optional[Tuple[int, ...]] = Depends(multi_get_ids),
+    fields: Optional[Tuple[str, ...]] = Depends(order_fields),
     db: Session = Depends(get_db)
 ):
-    """Get all orders or filter by email/status."""
+    """
+    Get all orders or filter by email/status.
+    
+    With ids, get those orders in request order instead; missing ones come
+    back as {"id": ..., "detail": "Order not found"}.
+    """
     service = OrderService(db)
+    if ids:
+        body = service.get_orders_by_ids_json(ids, fields or ORDER_FIELDS)
+        return Response(body, media_type="application/json")
     
-    if email:
-        orders = service.get_orders_by_customer(email, skip, limit)
-    elif status:
-        if status not in ["pending", "confirmed", "delivered"]:
-            raise HTTPException(status_code=400, detail="Invalid status")
-        orders = service.get_orders_by_status(status, skip, limit)
-    else:
-        orders = service.get_all_orders(skip, limit)
+    if not email and status and status not in ["pending", "confirmed", "delivered"]:
+        raise HTTPException(status_code=400, detail="Invalid status")
+    
+    if fields or settings.FAST_LIST_SERIALIZATION:
+        # Serialized from rows, bypassing response_model validation
+        body = service.list_orders_json(skip, limit, email, status, fields or ORDER_FIELDS)
+        return Response(body, media_type="application/json")
     
-    return orders
+    if email:
+        return service.get_orders_by_customer(email, skip, limit)
+    if status:
+        return service.get_orders_by_status(status, skip, limit)
+    return service.get_all_orders(skip, limit)
 
 
 @router.put("/{order_id}", response_model=OrderResponse)
@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.serialization import fields_param, ids_param
+from app.core.single_flight import read_coalescer, request_key
 from app.services import PaymentService
+from app.services.payment_service import PAYMENT_FIELDS
 from app.schemas import PaymentCreate, PaymentUpdate, PaymentResponse, PaymentConfirm, PaymentRefund
-from typing import List
+from typing import List, Optional, Tuple
 
 router = APIRouter()
 
+payment_fields = fields_param(PAYMENT_FIELDS)
+multi_get_ids = ids_param()
+
 
 @router.post("", response_model=PaymentResponse, status_code=201)
 def create_payment(
@@ -25,10 +32,17 @@ def create_payment(
 @router.get("/{payment_id}", response_model=PaymentResponse)
 def get_payment(
     payment_id: int,
+    fields: Optional[Tuple[str, ...]] = Depends(payment_fields),
     db: Session = Depends(get_db)
 ):
     """Get a payment by ID."""
     service = PaymentService(db)
+    if fields:
+        body = service.get_payment_json(payment_id, fields)
+        if body is None:
+            raise HTTPException(status_code=404, detail="Payment not found")
+        return Response(body, media_type="application/json")
+    
     payment = service.get_payment(payment_id)
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
@@ -42,18 +56,28 @@ def get_all_payments(
     order_id: int = None,
     status: str = None,
     method: str = None,
+    ids: Optional[Tuple[int, ...]] = Depends(multi_get_ids),
+    fields: Optional[Tuple[str, ...]] = Depends(payment_fields),
     db: Session = Depends(get_db)
 ):
-    """Get all payments with filters."""
+    """
+    Get all payments with filters.
+    
+    With ids, get those payments in request order instead; missing ones
+    come back as {"id": ..., "detail": "Payment not found"}.
+    """
     service = PaymentService(db)
+    if ids:
+        body = service.get_payments_by_ids_json(ids, fields or PAYMENT_FIELDS)
+        return Response(body, media_type="application/json")
     
     if order_id:
-        payments = service.get_payments_by_order(order_id)
+        status = method = None
     elif status:
         valid_statuses = ["pending", "processing", "completed", "failed", "refunded"]
         if status not in valid_statuses:
             raise HTTPException(status_code=400, detail="Invalid status")
-        payments = service.get_payments_by_status(status, skip, limit)
+        method = None
     elif method:
         valid_methods = [
             "credit_card", "debit_card", "paypal", 
@@ -61,11 +85,19 @@ def get_all_payments(
         ]
         if method not in valid_methods:
             raise HTTPException(status_code=400, detail="Invalid payment method")
-        payments = service.get_payments_by_method(method, skip, limit)
-    else:
-        payments = service.get_all_payments(skip, limit)
     
-    return payments
+    if fields or settings.FAST_LIST_SERIALIZATION:
+        # Serialized from rows, bypassing response_model validation
+        body = service.list_payments_json(skip, limit, order_id, status, method, fields or PAYMENT_FIELDS)
+        return Response(body, media_type="application/json")
+    
+    if order_id:
+        return service.get_payments_by_order(order_id)
+    if status:
+        return service.get_payments_by_status(status, skip, limit)
+    if method:
+        return service.get_payments_by_method(method, skip, limit)
+    return service.get_all_payments(skip, limit)
 
 
 @router.put("/{payment_id}", response_model=PaymentResponse)
@@ -144,8 +176,9 @@ def delete_payment(
 
 @router.get("/statistics/overview", response_model=dict)
 def get_payment_statistics(
+    request: Request,
     db: Session = Depends(get_db)
 ):
-    """Get payment statistics."""
+    """Get payment statistics, shared by concurrent callers and reused for a moment."""
     service = PaymentService(db)
-    return service.get_payment_statistics()
+    return read_coalescer.do(request_key(request), service.get_payment_statistics, settings.COALESCE_TTL_SECONDS)
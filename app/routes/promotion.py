@@ -1,15 +1,19 @@
 """Routes for promotion management."""
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.services.promotion_service import PromotionService
+from app.core.http_cache import cached_response
+from app.core.serialization import fields_param
+from app.core.single_flight import read_coalescer, request_key
+from app.services.promotion_service import PROMOTION_FIELDS, PromotionService
 from app.schemas.promotion import (
     PromotionCreate, PromotionUpdate, PromotionResponse,
     ApplyPromotion, PromotionResult
 )
-from typing import List
+from typing import List, Optional, Tuple
 
 router = APIRouter()
+promotion_fields = fields_param(PROMOTION_FIELDS)
 
 
 @router.post("", response_model=PromotionResponse, status_code=201)
@@ -29,10 +33,17 @@ def create_promotion(
 @router.get("/{promotion_id}", response_model=PromotionResponse)
 def get_promotion(
     promotion_id: int,
+    fields: Optional[Tuple[str, ...]] = Depends(promotion_fields),
     db: Session = Depends(get_db)
 ):
     """Get a promotion by ID."""
     service = PromotionService(db)
+    if fields:
+        body = service.get_promotion_json(promotion_id, fields)
+        if body is None:
+            raise HTTPException(status_code=404, detail="Promotion not found")
+        return Response(body, media_type="application/json")
+    
     promotion = service.get_promotion(promotion_id)
     if not promotion:
         raise HTTPException(status_code=404, detail="Promotion not found")
@@ -44,10 +55,15 @@ def get_all_promotions(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     active_only: bool = Query(True),
+    fields: Optional[Tuple[str, ...]] = Depends(promotion_fields),
     db: Session = Depends(get_db)
 ):
     """Get all promotions with optional filtering."""
     service = PromotionService(db)
+    if fields:
+        body = service.list_promotions_json(skip, limit, active_only, fields)
+        return Response(body, media_type="application/json")
+    
     promotions = service.get_all_promotions(skip, limit, active_only)
     return promotions
 
@@ -92,9 +108,14 @@ def apply_promotion(
 
 @router.get("/active/all", response_model=List[PromotionResponse])
 def get_active_promotions(
+    request: Request,
+    fields: Optional[Tuple[str, ...]] = Depends(promotion_fields),
     db: Session = Depends(get_db)
 ):
     """Get all currently active promotions."""
     service = PromotionService(db)
-    promotions = service.get_active_promotions()
-    return promotions
+    if fields:
+        return Response(service.get_active_promotions_json(fields), media_type="application/json")
+    
+    body, etag = read_coalescer.do(request_key(request), service.get_active_promotions_snapshot)
+    return cached_response(request, body, etag)
@@ -1,12 +1,22 @@
-from .food import FoodCreate, FoodUpdate, FoodResponse
+from .food import (
+    FoodCreate, FoodUpdate, FoodResponse, CategoryFacet, FoodFacets,
+    FoodImportRow, FoodImportError, FoodImportSummary, FoodChanges
+)
 from .order import OrderCreate, OrderUpdate, OrderResponse
 from .payment import PaymentCreate, PaymentUpdate, PaymentResponse, PaymentConfirm, PaymentRefund
 from .promotion import PromotionCreate, PromotionUpdate, PromotionResponse, ApplyPromotion, PromotionResult
+from .batch import BatchOperation, BatchRequest, BatchResult, BatchResponse
 
 __all__ = [
     "FoodCreate",
     "FoodUpdate",
     "FoodResponse",
+    "CategoryFacet",
+    "FoodFacets",
+    "FoodImportRow",
+    "FoodImportError",
+    "FoodImportSummary",
+    "FoodChanges",
     "OrderCreate",
     "OrderUpdate",
     "OrderResponse",
@@ -20,4 +30,8 @@ __all__ = [
     "PromotionResponse",
     "ApplyPromotion",
     "PromotionResult",
+    "BatchOperation",
+    "BatchRequest",
+    "BatchResult",
+    "BatchResponse",
 ]
@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
+
+
+class BatchOperation(BaseModel):
+    """DTO for one API call inside a batch."""
+    
+    method: str = Field(..., pattern="^(GET|POST|PUT|PATCH|DELETE)$")
+    path: str = Field(..., pattern="^/", max_length=2000, description="Path under the API root, query string included")
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    """DTO for a batch of API calls."""
+    
+    operations: List[BatchOperation] = Field(..., min_length=1, max_length=100)
+    atomic: bool = False
+
+
+class BatchResult(BaseModel):
+    """DTO for the outcome of one batched call."""
+    
+    status: int
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    """DTO for batch response."""
+    
+    committed: bool
+    results: List[BatchResult]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -37,3 +37,60 @@ class FoodResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class CategoryFacet(BaseModel):
+    """DTO for per-category catalog counts."""
+    
+    category: str
+    count: int
+    in_stock: int
+    min_price: float
+    max_price: float
+
+
+class FoodFacets(BaseModel):
+    """DTO for catalog facet counts."""
+    
+    total: int
+    in_stock: int
+    categories: List[CategoryFacet]
+
+
+class FoodImportRow(BaseModel):
+    """DTO for one row of a bulk catalog import, matched on name."""
+    
+    name: str = Field(..., min_length=1, max_length=255)
+    description: Optional[str] = Field(None, max_length=500)
+    price: Optional[float] = Field(None, gt=0)
+    category: Optional[str] = Field(None, min_length=1, max_length=100)
+    stock: Optional[int] = Field(None, ge=0)
+
+
+class FoodImportError(BaseModel):
+    """DTO for a rejected bulk import row."""
+    
+    row: int
+    name: Optional[str] = None
+    message: str
+
+
+class FoodImportSummary(BaseModel):
+    """DTO for the outcome of a bulk catalog import."""
+    
+    total_rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    errors: List[FoodImportError] = []
+
+
+class FoodChanges(BaseModel):
+    """DTO for a page of catalog changes since a sync cursor."""
+    
+    cursor: int
+    has_more: bool
+    reset: bool = False
+    updated: List[FoodResponse]
+    deleted: List[int]
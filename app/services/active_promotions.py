@@ -0,0 +1,109 @@
+"""In-memory set of currently valid promotions."""
+import heapq
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.cache import caches_bypassed
+from app.core.http_cache import make_etag
+from app.models.promotion import Promotion
+from app.schemas.promotion import PromotionResponse
+
+# valid_until is inclusive, so a promotion drops out just after it
+_EXPIRY_OFFSET = timedelta(microseconds=1)
+
+
+class ActivePromotionSet:
+    """
+    Precomputed list of promotions that are valid right now.
+
+    Promotions flagged ``is_active`` are loaded once. Every future
+    ``valid_from``/``valid_until`` boundary goes into a min-heap, and the
+    valid subset is only recomputed when the clock passes the earliest one.
+    Promotion writes call ``invalidate()`` once committed so the next read
+    reloads; while caches are bypassed (an atomic batch) reads load a
+    private copy and leave the shared one alone.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._candidates: Optional[List[Tuple[datetime, Optional[datetime], dict]]] = None
+        self._boundaries: List[datetime] = []
+        self._active: List[dict] = []
+        self._body = b"[]"
+        self._etag = make_etag(self._body)
+
+    def invalidate(self) -> None:
+        """Drop the loaded promotions so the next read hits the database."""
+        with self._lock:
+            self._candidates = None
+
+    def get(self, db: Session, now: Optional[datetime] = None) -> List[dict]:
+        """Get the currently valid promotions as response dicts."""
+        if caches_bypassed():
+            return self._uncached(db, now)._active
+        with self._lock:
+            self._refresh(db, now or datetime.utcnow())
+            return self._active
+
+    def snapshot(self, db: Session, now: Optional[datetime] = None) -> Tuple[bytes, str]:
+        """Get the currently valid promotions as serialized JSON and its ETag."""
+        if caches_bypassed():
+            current = self._uncached(db, now)
+            return current._body, current._etag
+        with self._lock:
+            self._refresh(db, now or datetime.utcnow())
+            return self._body, self._etag
+
+    @classmethod
+    def _uncached(cls, db: Session, now: Optional[datetime]) -> "ActivePromotionSet":
+        current = cls()
+        current._load(db, now or datetime.utcnow())
+        return current
+
+    def _refresh(self, db: Session, now: datetime) -> None:
+        if self._candidates is None:
+            self._load(db, now)
+        elif self._boundaries and self._boundaries[0] <= now:
+            while self._boundaries and self._boundaries[0] <= now:
+                heapq.heappop(self._boundaries)
+            self._recompute(now)
+
+    def _load(self, db: Session, now: datetime) -> None:
+        promotions = (
+            db.query(Promotion)
+            .filter(
+                Promotion.is_active == True,
+                (Promotion.valid_until == None) | (Promotion.valid_until >= now)
+            )
+            .order_by(Promotion.id)
+            .all()
+        )
+
+        candidates = []
+        boundaries = []
+        for promotion in promotions:
+            data = PromotionResponse.model_validate(promotion).model_dump(mode="json")
+            candidates.append((promotion.valid_from, promotion.valid_until, data))
+            if promotion.valid_from and promotion.valid_from > now:
+                boundaries.append(promotion.valid_from)
+            if promotion.valid_until:
+                boundaries.append(promotion.valid_until + _EXPIRY_OFFSET)
+
+        heapq.heapify(boundaries)
+        self._candidates = candidates
+        self._boundaries = boundaries
+        self._recompute(now)
+
+    def _recompute(self, now: datetime) -> None:
+        self._active = [
+            data for valid_from, valid_until, data in self._candidates
+            if valid_from is not None and valid_from <= now
+            and (valid_until is None or valid_until >= now)
+        ]
+        self._body = json.dumps(self._active, separators=(",", ":")).encode()
+        self._etag = make_etag(self._body)
+
+
+active_promotions = ActivePromotionSet()
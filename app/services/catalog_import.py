@@ -0,0 +1,108 @@
+"""Streaming readers for supplier catalog files (CSV, JSON arrays and JSON lines)."""
+import codecs
+import csv
+import json
+from typing import BinaryIO, Iterator, Optional, Union
+
+_READ_SIZE = 64 * 1024
+_MAX_RECORD_SIZE = 1024 * 1024
+_decoder = json.JSONDecoder()
+# A decode error this close to the end of the buffer may just be a record cut by the read
+_TRUNCATION_MARGIN = 16
+
+
+class MalformedRecord:
+    """Stands in for a record that could not be read, so the import can count it and go on."""
+
+    def __init__(self, message: str):
+        self.message = message
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    """Guess the catalog format from a file name or content type."""
+    name = (filename or "").lower()
+    if name.endswith(".csv") or (content_type or "").startswith("text/csv"):
+        return "csv"
+    return "json"
+
+
+def iter_csv_records(stream: BinaryIO) -> Iterator[Union[dict, MalformedRecord]]:
+    """Yield one dict per CSV row, reading the stream incrementally; unreadable rows yield a MalformedRecord."""
+    rows = csv.DictReader(codecs.getreader("utf-8-sig")(stream))
+    while True:
+        try:
+            row = next(rows)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield MalformedRecord(f"Malformed CSV: {e}")
+            continue
+        yield {key.strip(): value for key, value in row.items() if key and value not in (None, "")}
+
+
+def iter_json_records(stream: BinaryIO) -> Iterator[Union[dict, MalformedRecord]]:
+    """
+    Yield objects from a JSON array or from JSON lines without loading the whole file.
+
+    Only the object currently being decoded is buffered, so memory stays
+    proportional to the largest record rather than to the file. A record
+    that cannot be decoded, or is not an object, yields a MalformedRecord
+    and reading resumes at the next "{".
+    """
+    reader = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    position = 0
+    eof = False
+    array: Optional[bool] = None
+    resync = False
+    while True:
+        if resync:
+            start = buffer.find("{", position)
+            resync = start == -1
+            position = len(buffer) if resync else start
+        # Skip separators and whitespace between objects
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position < len(buffer):
+            if array is None:
+                array = buffer[position] == "["
+                position += array
+                continue
+            if array and buffer[position] == "]":
+                return
+
+        try:
+            if position >= len(buffer):
+                raise ValueError("need more data")
+            record, end = _decoder.raw_decode(buffer, position)
+        except ValueError as e:
+            truncated = not isinstance(e, json.JSONDecodeError) or (
+                e.pos >= len(buffer) - _TRUNCATION_MARGIN or e.msg.startswith("Unterminated string")
+            )
+            if position >= len(buffer) and eof:
+                return
+            if truncated and not eof and len(buffer) - position <= _MAX_RECORD_SIZE:
+                chunk = stream.read(_READ_SIZE)
+                eof = not chunk
+                buffer = buffer[position:] + reader.decode(chunk or b"", final=eof)
+                position = 0
+                continue
+            yield MalformedRecord(f"Malformed JSON near: {buffer[position:position + 50].splitlines()[0]!r}")
+            position += 1
+            resync = True
+            continue
+
+        position = end
+        if not isinstance(record, dict):
+            yield MalformedRecord("Each catalog entry must be a JSON object")
+            continue
+        yield record
+
+
+def iter_records(stream: BinaryIO, format: str) -> Iterator[Union[dict, MalformedRecord]]:
+    """Yield catalog records from a CSV or JSON stream."""
+    if format == "csv":
+        return iter_csv_records(stream)
+    if format == "json":
+        return iter_json_records(stream)
+    raise ValueError(f"Unsupported catalog format: {format}")
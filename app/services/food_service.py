@@ -1,8 +1,21 @@
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
+from app.core.cache import catalog_cache
+from app.core.serialization import dump_json, dump_rows, dump_rows_by_id
 from app.repositories import FoodRepository
-from app.schemas import FoodCreate, FoodUpdate
+from app.schemas import (
+    FoodCreate, FoodUpdate, FoodResponse, CategoryFacet, FoodFacets,
+    FoodImportRow, FoodImportError, FoodImportSummary, FoodChanges
+)
 from app.models import Food
-from typing import List, Optional
+from app.services.catalog_import import MalformedRecord
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+# Columns of a FoodResponse, in order
+FOOD_FIELDS = tuple(FoodResponse.model_fields)
+
+# Only the first errors are reported back; the rest are just counted
+MAX_IMPORT_ERRORS = 100
 
 
 class FoodService:
@@ -20,14 +33,192 @@ class FoodService:
         """Get a food item by ID."""
         return self.repository.get_by_id(food_id)
     
+    def get_food_json(self, food_id: int, fields: Sequence[str] = FOOD_FIELDS) -> Optional[bytes]:
+        """Get only the given fields of a food item as JSON, or None if it does not exist."""
+        row = self.repository.get_rows(fields, 0, 1, id=food_id)
+        return dump_json(dict(zip(fields, row[0]))) if row else None
+    
     def get_all_foods(self, skip: int = 0, limit: int = 100) -> List[Food]:
         """Get all food items."""
         return self.repository.get_all(skip, limit)
     
+    def count_foods(self) -> int:
+        """Count all food items."""
+        return self.repository.count()
+    
+    def get_food_labels(self) -> list:
+        """Get (id, name, price) for every food, in printing order."""
+        return self.repository.get_labels()
+    
     def get_foods_by_category(self, category: str, skip: int = 0, limit: int = 100) -> List[Food]:
         """Get food items by category."""
         return self.repository.get_by_category(category, skip, limit)
     
+    def search_foods(self, query: str, skip: int = 0, limit: int = 20) -> List[Food]:
+        """Search food items by name, description and category."""
+        return self.repository.search(query, skip, limit)
+    
+    def search_foods_json(
+        self, query: str, skip: int = 0, limit: int = 20, fields: Sequence[str] = FOOD_FIELDS
+    ) -> bytes:
+        """Search food items, returning only the given fields as JSON."""
+        return dump_rows(fields, self.repository.search(query, skip, limit, fields))
+    
+    @staticmethod
+    def catalog_etag(
+        skip: int = 0, limit: int = 100, category: Optional[str] = None, fields: Sequence[str] = FOOD_FIELDS
+    ) -> str:
+        """Get the ETag of a catalog page without touching the database."""
+        return catalog_cache.etag((skip, limit, category, tuple(fields)))
+    
+    def get_catalog_page(
+        self, skip: int = 0, limit: int = 100, category: Optional[str] = None, fields: Sequence[str] = FOOD_FIELDS
+    ) -> Tuple[bytes, str]:
+        """Get a catalog page as serialized JSON plus its ETag, cached until the next food write."""
+        def load() -> bytes:
+            filters = {"category": category} if category else {}
+            return dump_rows(fields, self.repository.get_rows(fields, skip, limit, **filters))
+        
+        return catalog_cache.get((skip, limit, category, tuple(fields)), load)
+    
+    @staticmethod
+    def foods_by_ids_etag(ids: Sequence[int], fields: Sequence[str] = FOOD_FIELDS) -> str:
+        """Get the ETag of a multi-get response without touching the database."""
+        return catalog_cache.etag(("ids", tuple(ids), tuple(fields)))
+    
+    def get_foods_by_ids(self, ids: Sequence[int], fields: Sequence[str] = FOOD_FIELDS) -> Tuple[bytes, str]:
+        """Get foods by ID in request order as JSON plus its ETag, with a marker for each missing ID."""
+        return catalog_cache.get(
+            ("ids", tuple(ids), tuple(fields)),
+            lambda: dump_rows_by_id(fields, self.repository.get_rows_by_ids(fields, ids), ids, "Food not found"),
+        )
+    
+    def get_facets(self) -> FoodFacets:
+        """Get per-category counts and price ranges for the catalog."""
+        categories = [
+            CategoryFacet(
+                category=category,
+                count=count,
+                in_stock=in_stock or 0,
+                min_price=min_price,
+                max_price=max_price,
+            )
+            for category, count, in_stock, min_price, max_price in self.repository.get_category_facets()
+        ]
+        return FoodFacets(
+            total=sum(facet.count for facet in categories),
+            in_stock=sum(facet.in_stock for facet in categories),
+            categories=categories,
+        )
+    
+    @staticmethod
+    def facets_etag() -> str:
+        """Get the ETag of the catalog facets without touching the database."""
+        return catalog_cache.etag("facets")
+    
+    def get_facets_snapshot(self) -> Tuple[bytes, str]:
+        """Get the catalog facets as serialized JSON plus its ETag, cached until the next food write."""
+        return catalog_cache.get("facets", lambda: self.get_facets().model_dump_json().encode())
+    
+    def get_changes(self, since: int = 0, limit: int = 500) -> FoodChanges:
+        """
+        Get the foods changed after a sync cursor, plus tombstones for deleted ones.
+        
+        A cursor ahead of the database (e.g. after a restore) comes back with
+        reset set, telling the client to discard its copy and sync from 0.
+        """
+        rows = self.repository.get_changes(since, limit + 1)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        if not rows:
+            last_seq = self.repository.get_last_change_seq()
+            if since > last_seq:
+                return FoodChanges(cursor=0, has_more=True, reset=True, updated=[], deleted=[])
+            return FoodChanges(cursor=since, has_more=False, updated=[], deleted=[])
+        
+        updated = [FoodResponse.model_validate(food) for change, food in rows if food is not None]
+        deleted = [change.food_id for change, food in rows if food is None]
+        return FoodChanges(cursor=rows[-1][0].seq, has_more=has_more, updated=updated, deleted=deleted)
+    
+    @staticmethod
+    def changes_etag(since: int = 0, limit: int = 500) -> str:
+        """Get the ETag of a change page without touching the database."""
+        return catalog_cache.etag(("changes", since, limit))
+    
+    def get_changes_snapshot(self, since: int = 0, limit: int = 500) -> Tuple[bytes, str]:
+        """Get a change page as serialized JSON plus its ETag, cached until the next food write."""
+        return catalog_cache.get(
+            ("changes", since, limit),
+            lambda: self.get_changes(since, limit).model_dump_json().encode(),
+        )
+    
+    def import_foods(self, records: Iterable[Union[dict, MalformedRecord]], chunk_size: int = 1000) -> FoodImportSummary:
+        """
+        Upsert foods by name from a stream of records, chunk_size rows at a time.
+        
+        Rows may carry any subset of the food fields; only supplied fields are
+        updated. New foods need at least a price and a category. Invalid or
+        malformed records are counted as failed and skipped. Each chunk is
+        committed on its own, so memory stays bounded by the chunk size.
+        """
+        summary = FoodImportSummary()
+        chunk: Dict[str, Tuple[int, dict]] = {}
+        row_number = 0
+        
+        try:
+            for row_number, record in enumerate(records, start=1):
+                summary.total_rows += 1
+                if isinstance(record, MalformedRecord):
+                    self._record_import_error(summary, row_number, None, record.message)
+                    continue
+                try:
+                    row = FoodImportRow.model_validate(record)
+                except ValidationError as e:
+                    error = e.errors()[0]
+                    field = ".".join(str(part) for part in error["loc"])
+                    self._record_import_error(summary, row_number, record.get("name"), f"{field}: {error['msg']}")
+                    continue
+                
+                # A repeated name is applied after the earlier row has been written
+                if row.name in chunk or len(chunk) >= chunk_size:
+                    self._import_chunk(chunk, summary)
+                    chunk = {}
+                chunk[row.name] = (row_number, row.model_dump(exclude_none=True))
+        except ValueError as e:
+            self._record_import_error(summary, row_number + 1, None, str(e))
+        
+        if chunk:
+            self._import_chunk(chunk, summary)
+        summary.errors.sort(key=lambda error: error.row)
+        return summary
+    
+    def _import_chunk(self, chunk: Dict[str, Tuple[int, dict]], summary: FoodImportSummary) -> None:
+        existing = self.repository.get_import_state(list(chunk))
+        rows = []
+        for name, (row_number, row) in chunk.items():
+            current = existing.get(name)
+            if current is None:
+                if "price" not in row or "category" not in row:
+                    self._record_import_error(summary, row_number, name, "New foods need a price and a category")
+                    continue
+                summary.inserted += 1
+            elif any(getattr(current, field) != value for field, value in row.items()):
+                summary.updated += 1
+            else:
+                summary.unchanged += 1
+                continue
+            rows.append(row)
+        
+        if rows:
+            self.repository.upsert_many(rows)
+    
+    @staticmethod
+    def _record_import_error(summary: FoodImportSummary, row: int, name: Optional[str], message: str) -> None:
+        summary.failed += 1
+        if len(summary.errors) < MAX_IMPORT_ERRORS:
+            summary.errors.append(FoodImportError(row=row, name=name, message=message))
+    
     def update_food(self, food_id: int, food_data: FoodUpdate) -> Optional[Food]:
         """Update a food item."""
         food_dict = food_data.model_dump(exclude_unset=True)
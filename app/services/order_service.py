@@ -1,9 +1,13 @@
 import json
 from sqlalchemy.orm import Session
+from app.core.serialization import dump_json, dump_rows, dump_rows_by_id
 from app.repositories import OrderRepository, FoodRepository
-from app.schemas import OrderCreate, OrderUpdate
+from app.schemas import OrderCreate, OrderUpdate, OrderResponse
 from app.models import Order
-from typing import List, Optional
+from typing import List, Optional, Sequence
+
+# Columns of a OrderResponse, in order
+ORDER_FIELDS = tuple(OrderResponse.model_fields)
 
 
 class OrderService:
@@ -57,6 +61,11 @@ class OrderService:
         """Get an order by ID."""
         return self.order_repository.get_by_id(order_id)
     
+    def get_order_json(self, order_id: int, fields: Sequence[str] = ORDER_FIELDS) -> Optional[bytes]:
+        """Get only the given fields of an order as JSON, or None if it does not exist."""
+        row = self.order_repository.get_rows(fields, 0, 1, id=order_id)
+        return dump_json(dict(zip(fields, row[0]))) if row else None
+    
     def get_all_orders(self, skip: int = 0, limit: int = 100) -> List[Order]:
         """Get all orders."""
         return self.order_repository.get_all(skip, limit)
@@ -69,6 +78,24 @@ class OrderService:
         """Get orders by status."""
         return self.order_repository.get_by_status(status, skip, limit)
     
+    def list_orders_json(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        email: Optional[str] = None,
+        status: Optional[str] = None,
+        fields: Sequence[str] = ORDER_FIELDS,
+    ) -> bytes:
+        """Get a page of orders serialized straight from row tuples, skipping ORM objects and models."""
+        filters = {"customer_email": email} if email else {"status": status} if status else {}
+        rows = self.order_repository.get_rows(fields, skip, limit, **filters)
+        return dump_rows(fields, rows)
+    
+    def get_orders_by_ids_json(self, ids: Sequence[int], fields: Sequence[str] = ORDER_FIELDS) -> bytes:
+        """Get orders by ID in request order as JSON, with a marker for each missing ID."""
+        rows = self.order_repository.get_rows_by_ids(fields, ids)
+        return dump_rows_by_id(fields, rows, ids, "Order not found")
+    
     def update_order(self, order_id: int, order_data: OrderUpdate) -> Optional[Order]:
         """Update an order."""
         order_dict = order_data.model_dump(exclude_unset=True)
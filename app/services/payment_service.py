@@ -1,9 +1,13 @@
 import uuid
 from sqlalchemy.orm import Session
+from app.core.serialization import dump_json, dump_rows, dump_rows_by_id
 from app.repositories import PaymentRepository, OrderRepository
-from app.schemas import PaymentCreate, PaymentUpdate
+from app.schemas import PaymentCreate, PaymentUpdate, PaymentResponse
 from app.models.payment import Payment, PaymentStatusEnum, PaymentMethodEnum
-from typing import List, Optional
+from typing import List, Optional, Sequence
+
+# Columns of a PaymentResponse, in order
+PAYMENT_FIELDS = tuple(PaymentResponse.model_fields)
 
 
 class PaymentService:
@@ -60,6 +64,11 @@ class PaymentService:
         """Get a payment by ID."""
         return self.repository.get_by_id(payment_id)
     
+    def get_payment_json(self, payment_id: int, fields: Sequence[str] = PAYMENT_FIELDS) -> Optional[bytes]:
+        """Get only the given fields of a payment as JSON, or None if it does not exist."""
+        row = self.repository.get_rows(fields, 0, 1, id=payment_id)
+        return dump_json(dict(zip(fields, row[0]))) if row else None
+    
     def get_all_payments(self, skip: int = 0, limit: int = 100) -> List[Payment]:
         """Get all payments."""
         return self.repository.get_all(skip, limit)
@@ -76,6 +85,29 @@ class PaymentService:
         """Get payments by payment method."""
         return self.repository.get_by_method(method, skip, limit)
     
+    def list_payments_json(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        order_id: Optional[int] = None,
+        status: Optional[str] = None,
+        method: Optional[str] = None,
+        fields: Sequence[str] = PAYMENT_FIELDS,
+    ) -> bytes:
+        """Get a page of payments serialized straight from row tuples, skipping ORM objects and models."""
+        if order_id:
+            # Every payment of an order, as get_payments_by_order returns them
+            rows = self.repository.get_rows(fields, 0, None, order_id=order_id)
+        else:
+            filters = {"status": status} if status else {"payment_method": method} if method else {}
+            rows = self.repository.get_rows(fields, skip, limit, **filters)
+        return dump_rows(fields, rows)
+    
+    def get_payments_by_ids_json(self, ids: Sequence[int], fields: Sequence[str] = PAYMENT_FIELDS) -> bytes:
+        """Get payments by ID in request order as JSON, with a marker for each missing ID."""
+        rows = self.repository.get_rows_by_ids(fields, ids)
+        return dump_rows_by_id(fields, rows, ids, "Payment not found")
+    
     def update_payment(self, payment_id: int, payment_data: PaymentUpdate) -> Optional[Payment]:
         """Update a payment."""
         payment = self.repository.get_by_id(payment_id)
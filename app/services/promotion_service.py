@@ -1,8 +1,15 @@
 """Service for promotion management and calculations."""
 from sqlalchemy.orm import Session
 from datetime import datetime
+from typing import Optional, Sequence
+from app.core.database import after_commit
+from app.core.serialization import dump_json, dump_rows
 from app.repositories.promotion_repository import PromotionRepository
-from app.schemas.promotion import PromotionCreate, PromotionUpdate
+from app.services.active_promotions import active_promotions
+from app.schemas.promotion import PromotionCreate, PromotionUpdate, PromotionResponse
+
+# Columns of a PromotionResponse, in order
+PROMOTION_FIELDS = tuple(PromotionResponse.model_fields)
 
 
 class PromotionService:
@@ -20,26 +27,54 @@ class PromotionService:
             raise ValueError(f"Promotion code '{promotion_data.code}' already exists")
         
         promotion = self.repo.create(self.db, promotion_data)
+        after_commit(active_promotions.invalidate)
         return promotion
 
     def get_promotion(self, promotion_id: int) -> dict:
         """Get promotion by ID."""
         return self.repo.get_by_id(self.db, promotion_id)
 
+    def get_promotion_json(self, promotion_id: int, fields: Sequence[str] = PROMOTION_FIELDS) -> Optional[bytes]:
+        """Get only the given fields of a promotion as JSON, or None if it does not exist."""
+        row = self.repo.get_rows(self.db, fields, 0, 1, id=promotion_id)
+        return dump_json(dict(zip(fields, row[0]))) if row else None
+
     def get_all_promotions(self, skip: int = 0, limit: int = 100, active_only: bool = True) -> list:
         """Get all promotions."""
+        if active_only:
+            return active_promotions.get(self.db)[skip:skip + limit]
         return self.repo.get_all(self.db, skip, limit, active_only)
 
+    def list_promotions_json(
+        self, skip: int = 0, limit: int = 100, active_only: bool = True, fields: Sequence[str] = PROMOTION_FIELDS
+    ) -> bytes:
+        """Get a page of promotions with only the given fields as JSON."""
+        if active_only:
+            return self.get_active_promotions_json(fields, skip, limit)
+        return dump_rows(fields, self.repo.get_rows(self.db, fields, skip, limit))
+
+    def get_active_promotions_json(
+        self, fields: Sequence[str] = PROMOTION_FIELDS, skip: int = 0, limit: Optional[int] = None
+    ) -> bytes:
+        """Get the currently valid promotions with only the given fields as JSON."""
+        active = active_promotions.get(self.db)
+        page = active[skip:] if limit is None else active[skip:skip + limit]
+        return dump_json([{field: promotion[field] for field in fields} for promotion in page])
+
     def update_promotion(self, promotion_id: int, promotion_data: PromotionUpdate) -> dict:
         """Update a promotion."""
         promotion = self.repo.update(self.db, promotion_id, promotion_data)
         if not promotion:
             raise ValueError(f"Promotion with ID {promotion_id} not found")
+        after_commit(active_promotions.invalidate)
         return promotion
 
     def delete_promotion(self, promotion_id: int) -> bool:
         """Delete a promotion."""
-        return self.repo.delete(self.db, promotion_id)
+        deleted = self.repo.delete(self.db, promotion_id)
+        if deleted:
+            after_commit(active_promotions.invalidate)
+        return deleted
 
     def apply_promotion(self, code: str, order_total: float) -> dict:
         """Apply a promotion code to an order and return discount details."""
@@ -111,6 +146,7 @@ class PromotionService:
         
         # Increment promotion usage
         self.repo.increment_usage(self.db, promotion.id)
+        after_commit(active_promotions.invalidate)
         
         return {
             "is_valid": True,
@@ -126,4 +162,8 @@ class PromotionService:
 
     def get_active_promotions(self) -> list:
         """Get all currently active promotions."""
-        return self.repo.get_valid_promotions(self.db)
+        return active_promotions.get(self.db)
+
+    def get_active_promotions_snapshot(self) -> tuple:
+        """Get the serialized active promotions and their ETag."""
+        return active_promotions.snapshot(self.db)
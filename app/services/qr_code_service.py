@@ -1,13 +1,145 @@
+import base64
+import hashlib
+import html
 import io
 import qrcode
+import time
 from PIL import Image
-from typing import Optional
+from functools import lru_cache
+from typing import Tuple
+from app.core.cache import ByteLRUCache
 from app.core.config import settings
+from app.core.metrics import QR_RENDER_DURATION
+from app.core.process_pool import BoundedProcessPool
+
+# Rendered images keyed by a hash of everything that affects the output
+qr_cache = ByteLRUCache(settings.QR_CACHE_MAX_BYTES, settings.QR_CACHE_DIR)
+
+# Cache misses are rendered in worker processes, off the request threads' GIL
+qr_render_pool = BoundedProcessPool(
+    "QR render",
+    workers=settings.QR_RENDER_WORKERS,
+    max_pending=settings.QR_RENDER_QUEUE,
+    retry_after=settings.QR_RENDER_RETRY_AFTER,
+)
+
+IMAGE_MEDIA_TYPES = {"PNG": "image/png", "JPEG": "image/jpeg", "SVG": "image/svg+xml"}
+
+
+# Bump when rendering changes so stale images in QR_CACHE_DIR are not served
+_RENDERER_VERSION = 2
+
+
+def _cache_key(data: str, size: int, border: int, format: str) -> str:
+    return hashlib.blake2b(f"{_RENDERER_VERSION}\0{format}\0{size}\0{border}\0{data}".encode(), digest_size=16).hexdigest()
+
+
+@lru_cache(maxsize=256)
+def _qr_matrix(data: str, border: int) -> Tuple[Tuple[bool, ...], ...]:
+    """Encode data once into a module matrix (True = dark), border included."""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        border=border,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    return tuple(tuple(row) for row in qr.get_matrix())
+
+
+def _encode_image(matrix: Tuple[Tuple[bool, ...], ...], size: int, format: str) -> bytes:
+    """Rasterize at one pixel per module, then scale up without resampling."""
+    modules = len(matrix)
+    img = Image.new("1", (modules, modules))
+    img.putdata([0 if dark else 255 for row in matrix for dark in row])
+    img = img.resize((modules * size, modules * size), Image.NEAREST)
+    img_bytes = io.BytesIO()
+    img.save(img_bytes, format=format)
+    return img_bytes.getvalue()
+
+
+def _encode_svg(matrix: Tuple[Tuple[bool, ...], ...], size: int) -> bytes:
+    """
+    Draw each horizontal run of dark modules as a one-module-wide stroke.
+
+    Runs after the first in a row are relative moves, which keeps the path
+    (and the page it is inlined into) small.
+    """
+    modules = len(matrix)
+    path = []
+    for y, row in enumerate(matrix):
+        pen = None
+        x = 0
+        while x < modules:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < modules and row[x]:
+                x += 1
+            move = f"M{start} {y}" if pen is None else f"m{start - pen} 0"
+            path.append(f"{move}h{x - start}")
+            pen = x
+    pixels = modules * size
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{pixels}" height="{pixels}" '
+        f'viewBox="0 0 {modules} {modules}" shape-rendering="crispEdges">'
+        f'<rect width="100%" height="100%" fill="#fff"/>'
+        f'<path stroke="#000" transform="translate(0 .5)" d="{"".join(path)}"/></svg>'
+    ).encode()
+
+
+def _render(data: str, size: int, border: int, format: str) -> bytes:
+    matrix = _qr_matrix(data, border)
+    if format == "SVG":
+        return _encode_svg(matrix, size)
+    return _encode_image(matrix, size, format)
 
 
 class QRCodeService:
     """Service for generating QR codes for payment and product pages."""
     
+    @staticmethod
+    def render_qr_code(
+        data: str,
+        size: int = 10,
+        border: int = 2,
+        format: str = "PNG"
+    ) -> bytes:
+        """
+        Render a QR code to encoded bytes, reusing earlier renders.
+        
+        The data is encoded into a module matrix once; PNG/JPEG and SVG are
+        drawn from that matrix, and the result is cached by content hash.
+        Cache misses render in the QR process pool, which raises
+        PoolSaturated when it is too busy to queue more work.
+        
+        Args:
+            data: The data to encode in the QR code (URL or text)
+            size: The size of each box in pixels
+            border: The border size in boxes
+            format: PNG, JPEG or SVG
+        
+        Returns:
+            The encoded image
+        """
+        format = format.upper()
+        if format not in IMAGE_MEDIA_TYPES:
+            raise ValueError(f"Unsupported QR code format: {format}")
+        
+        def render() -> bytes:
+            start = time.perf_counter()
+            image = qr_render_pool.run(_render, data, size, border, format)
+            QR_RENDER_DURATION.observe(time.perf_counter() - start, format)
+            return image
+        
+        return qr_cache.get(_cache_key(data, size, border, format), render)
+    
+    @staticmethod
+    def image_etag(data: str, format: str = "PNG", size: int = 10, border: int = 2) -> str:
+        """Strong ETag of a QR image, known without rendering or any lookup."""
+        return f'"{_cache_key(data, size, border, format.upper())}"'
+    
     @staticmethod
     def generate_qr_code(
         data: str,
@@ -22,28 +154,12 @@ class QRCodeService:
             data: The data to encode in the QR code (URL or text)
             size: The size of each box in pixels
             border: The border size in boxes
-            format: The image format (PNG, JPEG, etc.)
+            format: The image format (PNG, JPEG or SVG)
         
         Returns:
             BytesIO object containing the QR code image
         """
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=size,
-            border=border,
-        )
-        qr.add_data(data)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Convert to BytesIO
-        img_bytes = io.BytesIO()
-        img.save(img_bytes, format=format)
-        img_bytes.seek(0)
-        
-        return img_bytes
+        return io.BytesIO(QRCodeService.render_qr_code(data, size, border, format))
     
     @staticmethod
     def generate_qr_code_base64(
@@ -62,71 +178,79 @@ class QRCodeService:
         Returns:
             Base64 encoded string of the QR code image
         """
-        import base64
-        
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=size,
-            border=border,
-        )
-        qr.add_data(data)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Convert to base64
-        img_bytes = io.BytesIO()
-        img.save(img_bytes, format="PNG")
-        img_bytes.seek(0)
+        png = QRCodeService.render_qr_code(data, size, border, "PNG")
+        return f"data:image/png;base64,{base64.b64encode(png).decode()}"
+    
+    @staticmethod
+    def cache_stats() -> dict:
+        """Hit-rate statistics for the rendered QR code cache."""
+        return qr_cache.stats()
+    
+    @staticmethod
+    def embed_qr_code(data: str, format: str = "SVG", alt: str = "QR Code") -> str:
+        """
+        Get HTML markup that shows a QR code inline in a page.
         
-        img_base64 = base64.b64encode(img_bytes.getvalue()).decode()
-        return f"data:image/png;base64,{img_base64}"
+        SVG is inlined as markup (no PIL encode, no base64 overhead); PNG is
+        embedded as a base64 data URI.
+        """
+        if format.upper() == "SVG":
+            svg = QRCodeService.render_qr_code(data, format="SVG").decode()
+            return svg.replace("<svg ", f'<svg role="img" aria-label="{html.escape(alt)}" ', 1)
+        return f'<img src="{QRCodeService.generate_qr_code_base64(data)}" alt="{html.escape(alt)}">'
+    
+    @staticmethod
+    def food_url(food_id: int) -> str:
+        return f"{settings.API_BASE_URL}/foods/{food_id}"
+    
+    @staticmethod
+    def payment_url(payment_id: int) -> str:
+        return f"{settings.API_BASE_URL}/pay/{payment_id}"
+    
+    @staticmethod
+    def order_url(order_id: int) -> str:
+        return f"{settings.API_BASE_URL}/orders/{order_id}"
+    
+    @staticmethod
+    def website_url() -> str:
+        return f"{settings.API_BASE_URL}/"
     
     @staticmethod
-    def generate_food_qr_code(food_id: int) -> io.BytesIO:
+    def generate_food_qr_code(food_id: int, format: str = "PNG") -> io.BytesIO:
         """Generate QR code for a food item."""
-        url = f"{settings.API_BASE_URL}/foods/{food_id}"
-        return QRCodeService.generate_qr_code(url)
+        return QRCodeService.generate_qr_code(QRCodeService.food_url(food_id), format=format)
     
     @staticmethod
     def generate_food_qr_code_base64(food_id: int) -> str:
         """Generate QR code for a food item as base64."""
-        url = f"{settings.API_BASE_URL}/foods/{food_id}"
-        return QRCodeService.generate_qr_code_base64(url)
+        return QRCodeService.generate_qr_code_base64(QRCodeService.food_url(food_id))
     
     @staticmethod
-    def generate_payment_qr_code(payment_id: int) -> io.BytesIO:
+    def generate_payment_qr_code(payment_id: int, format: str = "PNG") -> io.BytesIO:
         """Generate QR code for a payment (scan-to-pay)."""
-        url = f"{settings.API_BASE_URL}/pay/{payment_id}"
-        return QRCodeService.generate_qr_code(url)
+        return QRCodeService.generate_qr_code(QRCodeService.payment_url(payment_id), format=format)
     
     @staticmethod
     def generate_payment_qr_code_base64(payment_id: int) -> str:
         """Generate QR code for a payment as base64."""
-        url = f"{settings.API_BASE_URL}/pay/{payment_id}"
-        return QRCodeService.generate_qr_code_base64(url)
+        return QRCodeService.generate_qr_code_base64(QRCodeService.payment_url(payment_id))
     
     @staticmethod
-    def generate_order_qr_code(order_id: int) -> io.BytesIO:
+    def generate_order_qr_code(order_id: int, format: str = "PNG") -> io.BytesIO:
         """Generate QR code for an order."""
-        url = f"{settings.API_BASE_URL}/orders/{order_id}"
-        return QRCodeService.generate_qr_code(url)
+        return QRCodeService.generate_qr_code(QRCodeService.order_url(order_id), format=format)
     
     @staticmethod
     def generate_order_qr_code_base64(order_id: int) -> str:
         """Generate QR code for an order as base64."""
-        url = f"{settings.API_BASE_URL}/orders/{order_id}"
-        return QRCodeService.generate_qr_code_base64(url)
+        return QRCodeService.generate_qr_code_base64(QRCodeService.order_url(order_id))
 
     @staticmethod
-    def generate_website_qr_code() -> io.BytesIO:
+    def generate_website_qr_code(format: str = "PNG") -> io.BytesIO:
         """Generate QR code that points to the website root."""
-        url = f"{settings.API_BASE_URL}/"
-        return QRCodeService.generate_qr_code(url)
+        return QRCodeService.generate_qr_code(QRCodeService.website_url(), format=format)
 
     @staticmethod
     def generate_website_qr_code_base64() -> str:
         """Generate QR code for the website root as base64."""
-        url = f"{settings.API_BASE_URL}/"
-        return QRCodeService.generate_qr_code_base64(url)
+        return QRCodeService.generate_qr_code_base64(QRCodeService.website_url())
@@ -0,0 +1,154 @@
+"""Printable A4 sheets of food QR codes, as PNG pages or a streamed PDF."""
+import hashlib
+import io
+import zlib
+from typing import Callable, Iterator, List, Sequence, Tuple
+from PIL import Image, ImageDraw, ImageFont
+from app.core.cache import catalog_cache
+from app.services.qr_code_service import QRCodeService, _RENDERER_VERSION, _qr_matrix, qr_cache, qr_render_pool
+
+# A4 at 150 DPI, with a 4 x 5 grid of labelled QR codes per page
+DPI = 150
+PAGE_WIDTH, PAGE_HEIGHT = 1240, 1754
+COLUMNS, ROWS = 4, 5
+PER_PAGE = COLUMNS * ROWS
+MARGIN = 60
+LABEL_HEIGHT = 44
+
+# (QR data, name, price line) for one cell
+SheetEntry = Tuple[str, str, str]
+
+
+def food_entries(labels: Sequence[tuple]) -> List[SheetEntry]:
+    """Sheet cells for (id, name, price) food rows."""
+    return [(QRCodeService.food_url(food_id), name, f"#{food_id}  ${price:.2f}") for food_id, name, price in labels]
+
+
+def sheet_etag(format: str, page: int) -> str:
+    """ETag of a sheet; sheets only change when the catalog does."""
+    return catalog_cache.etag(("qr-sheet", format, page))
+
+
+def page_count(entries: int) -> int:
+    return max(1, -(-entries // PER_PAGE))
+
+
+def cached_page_count(count_foods: Callable[[], int]) -> int:
+    """Number of sheet pages, counted once per catalog version."""
+    body, _ = catalog_cache.get(("qr-sheet", "pages"), lambda: str(page_count(count_foods())).encode())
+    return int(body)
+
+
+def paginate(entries: Sequence[SheetEntry]) -> List[List[SheetEntry]]:
+    """Split entries into pages; an empty catalog still gets one blank page."""
+    return [list(entries[start:start + PER_PAGE]) for start in range(0, len(entries), PER_PAGE)] or [[]]
+
+
+def render_page(entries: List[SheetEntry], format: str) -> bytes:
+    """
+    Lay out one sheet. Runs in the QR render pool.
+
+    PNG returns an encoded image; PDF returns the page's Flate-compressed
+    grayscale pixels, ready to be embedded as an image XObject.
+    """
+    page = Image.new("L", (PAGE_WIDTH, PAGE_HEIGHT), 255)
+    draw = ImageDraw.Draw(page)
+    font = ImageFont.load_default()
+    cell_width = (PAGE_WIDTH - 2 * MARGIN) // COLUMNS
+    cell_height = (PAGE_HEIGHT - 2 * MARGIN) // ROWS
+
+    for index, (data, name, price) in enumerate(entries):
+        left = MARGIN + (index % COLUMNS) * cell_width
+        top = MARGIN + (index // COLUMNS) * cell_height
+        matrix = _qr_matrix(data, 2)
+        modules = len(matrix)
+        box = max(1, (min(cell_width, cell_height - LABEL_HEIGHT) - 20) // modules)
+        qr = Image.new("L", (modules, modules))
+        qr.putdata([0 if dark else 255 for row in matrix for dark in row])
+        qr = qr.resize((modules * box, modules * box), Image.NEAREST)
+        page.paste(qr, (left + (cell_width - qr.width) // 2, top))
+
+        label_top = top + qr.height + 4
+        for offset, text in ((0, _fit(draw, font, name, cell_width - 10)), (18, price)):
+            width = draw.textlength(text, font=font)
+            draw.text((left + (cell_width - width) / 2, label_top + offset), text, fill=0, font=font)
+
+    if format == "PNG":
+        image_bytes = io.BytesIO()
+        page.save(image_bytes, format="PNG", optimize=True)
+        return image_bytes.getvalue()
+    return zlib.compress(page.tobytes(), 6)
+
+
+def _fit(draw: ImageDraw.ImageDraw, font, text: str, width: int) -> str:
+    if draw.textlength(text, font=font) <= width:
+        return text
+    while text and draw.textlength(text + "...", font=font) > width:
+        text = text[:-1]
+    return text + "..."
+
+
+def _page_key(entries: List[SheetEntry]) -> str:
+    cells = "\0".join("\1".join(entry) for entry in entries)
+    return hashlib.blake2b(f"{_RENDERER_VERSION}\0sheet\0{cells}".encode(), digest_size=16).hexdigest()
+
+
+def render_png_page(entries: Sequence[SheetEntry], page: int) -> bytes:
+    """Render a single 1-based page as PNG, kept in the byte-bounded QR image cache."""
+    cells = paginate(entries)[page - 1]
+    return qr_cache.get(_page_key(cells), lambda: qr_render_pool.run(render_page, cells, "PNG"))
+
+
+def iter_png_pages(entries: Sequence[SheetEntry]) -> Iterator[bytes]:
+    """Render every page as PNG in parallel in the QR pool, yielding them in order."""
+    return qr_render_pool.map(render_page, ((page, "PNG") for page in paginate(entries)))
+
+
+def iter_pdf(entries: Sequence[SheetEntry]) -> Iterator[bytes]:
+    """
+    Stream a PDF with one page per sheet, writing each page as soon as it is rendered.
+
+    The PDF is written by hand so pages never have to be held in memory
+    together. It contains no timestamps or ids, so the same catalog always
+    produces the same bytes.
+    """
+    pages = paginate(entries)
+    # Object numbers: 1 catalog, 2 page tree, then image, content and page per sheet
+    offsets = {}
+    position = 0
+
+    def emit(number: int, body: bytes) -> bytes:
+        nonlocal position
+        offsets[number] = position
+        chunk = b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        position += len(chunk)
+        return chunk
+
+    header = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+    position = len(header)
+    yield header
+
+    width_pt, height_pt = PAGE_WIDTH * 72 / DPI, PAGE_HEIGHT * 72 / DPI
+    for index, pixels in enumerate(qr_render_pool.map(render_page, ((page, "PDF") for page in pages))):
+        image, content, page = 3 + 3 * index, 4 + 3 * index, 5 + 3 * index
+        draw = b"q %.2f 0 0 %.2f 0 0 cm /Im0 Do Q" % (width_pt, height_pt)
+        yield emit(image, (
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+            b"/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>\nstream\n"
+            % (PAGE_WIDTH, PAGE_HEIGHT, len(pixels))
+        ) + pixels + b"\nendstream")
+        yield emit(content, b"<< /Length %d >>\nstream\n" % len(draw) + draw + b"\nendstream")
+        yield emit(page, (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] "
+            b"/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>"
+            % (width_pt, height_pt, image, content)
+        ))
+
+    kids = b" ".join(b"%d 0 R" % (5 + 3 * index) for index in range(len(pages)))
+    yield emit(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(pages)))
+    yield emit(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    count = max(offsets) + 1
+    xref = [b"xref\n0 %d\n" % count, b"0000000000 65535 f \n"]
+    xref += [b"%010d 00000 n \n" % offsets[number] for number in range(1, count)]
+    yield b"".join(xref) + b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (count, position)
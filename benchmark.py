@@ -0,0 +1,792 @@
+"""
+In-process benchmarks for the Food Shop API.
+
+Each benchmark runs against a throwaway SQLite database, so the real
+food_shop.db is never touched. Requests go through the full ASGI stack
+with FastAPI's TestClient (no network).
+
+Usage:
+    python benchmark.py catalog [--items 100] [--duration 2]
+    python benchmark.py search [--items 100000]
+    python benchmark.py stream [--subscribers 1000] [--events 500]
+    python benchmark.py qr [--duration 2]
+    python benchmark.py qr-burst [--duration 5] [--subscribers 8]
+    python benchmark.py pages [--duration 2]
+    python benchmark.py index [--duration 2]
+    python benchmark.py lists [--duration 2]
+    python benchmark.py coalesce [--subscribers 50] [--items 5000]
+    python benchmark.py overload [--duration 5] [--subscribers 8]
+    python benchmark.py metrics [--duration 2]
+    python benchmark.py queries [--items 1000]
+    python benchmark.py batch [--duration 2]
+"""
+import argparse
+import asyncio
+import atexit
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+_DB_DIR = tempfile.mkdtemp(prefix="food_shop_bench_")
+atexit.register(shutil.rmtree, _DB_DIR, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'bench.db')}"
+
+import json
+from typing import List
+
+import httpx
+import qrcode
+from fastapi.responses import HTMLResponse
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from sqlalchemy import insert, update
+from app.core.cache import catalog_cache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.load_shedding import concurrency_limiters, default_limiters
+from app.core.metrics import MetricsMiddleware
+from app.core.query_stats import track_queries
+from app.core.events import RESET, BroadcastHub
+from app.core import serialization
+from app.core.serialization import dump_rows
+from app.core.single_flight import read_coalescer
+from app.core.templates import Markup
+from app.models import Food, Order, Payment
+from app.repositories import OrderRepository
+from app.schemas import OrderResponse
+from app.services import FoodService
+from app.services.order_service import ORDER_FIELDS
+from app.services.qr_code_service import QRCodeService, _qr_matrix, qr_cache, qr_render_pool
+from app.routes import qr_code as qr_routes
+from main import INDEX_PATH, app
+
+API = settings.API_V1_STR
+CATEGORIES = ["Burgers", "Pizza", "Salads", "Drinks", "Desserts", "Wraps"]
+STYLES = ["Classic", "Spicy", "Smoky", "Grilled", "Crispy", "Vegan", "Double", "Mini", "Garden", "House"]
+DISHES = ["Hamburger", "Pepperoni", "Margherita", "Caesar", "Lemonade", "Brownie", "Burrito", "Falafel", "Tiramisu", "Nachos"]
+INGREDIENTS = ["cheese", "tomato", "basil", "chicken", "beef", "avocado", "mushroom", "chocolate", "lime", "jalapeno"]
+
+
+def seed_foods(count: int) -> None:
+    """Insert sample foods into the benchmark database."""
+    rng = random.Random(42)
+    rows = [
+        {
+            "name": f"{rng.choice(STYLES)} {rng.choice(DISHES)} {i}",
+            "description": f"Made with {rng.choice(INGREDIENTS)} and {rng.choice(INGREDIENTS)}",
+            "price": round(3 + (i % 40) * 0.5, 2),
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "stock": i % 50,
+        }
+        for i in range(count)
+    ]
+    db = SessionLocal()
+    try:
+        db.query(Food).delete()
+        for start in range(0, count, 5000):
+            db.execute(insert(Food), rows[start:start + 5000])
+        db.commit()
+    finally:
+        db.close()
+    catalog_cache.invalidate()
+
+
+def measure(label: str, func, duration: float, unit: str = "req") -> float:
+    """Call func repeatedly for duration seconds and print its throughput."""
+    func()  # warm up
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + duration
+    while time.perf_counter() < deadline:
+        func()
+        calls += 1
+    elapsed = time.perf_counter() - start
+    rate = calls / elapsed
+    print(f"  {label:<40} {rate:>10.1f} {unit}/s  {1000 / rate:>8.3f} ms/{unit}")
+    return rate
+
+
+def measure_latency(label: str, func, iterations: int) -> None:
+    """Call func iterations times and print its latency percentiles."""
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        func(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    print_percentiles(label, samples)
+
+
+def print_percentiles(label: str, samples: list) -> None:
+    """Print p50/p99/max of latency samples in milliseconds."""
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2]
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"  {label:<40} p50 {p50:>7.3f} ms  p99 {p99:>7.3f} ms  max {samples[-1]:>7.3f} ms")
+
+
+def bench_catalog(args) -> None:
+    """GET /foods with and without the catalog snapshot cache."""
+    seed_foods(args.items)
+    url = f"{API}/foods"
+
+    with TestClient(app) as client:
+        def uncached():
+            catalog_cache.invalidate()
+            assert client.get(url).status_code == 200
+
+        def cached():
+            assert client.get(url).status_code == 200
+
+        def conditional():
+            assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+        # A sparse fieldset must page exactly like the full representation
+        for page in (f"{url}?limit=10", f"{url}?skip=10&limit=10", f"{url}?category=Pizza&limit=10"):
+            ids = [food["id"] for food in client.get(page).json()]
+            for fields in ("id,name", "id,category", "id,price"):
+                sparse = [food["id"] for food in client.get(f"{page}&fields={fields}").json()]
+                assert sparse == ids, f"{page}&fields={fields} returned {sparse}, expected {ids}"
+
+        print(f"GET /foods ({args.items} foods in the catalog, page size 100)")
+        before = measure("before: query + serialize every request", uncached, args.duration)
+        after = measure("after: cached snapshot (200)", cached, args.duration)
+        etag = client.get(url).headers["etag"]
+        revalidated = measure("after: If-None-Match (304)", conditional, args.duration)
+        print(f"  speedup: {after / before:.1f}x (200), {revalidated / before:.1f}x (304)")
+
+
+def bench_search(args) -> None:
+    """Full-text food search latency at catalog scale."""
+    seed_foods(args.items)
+    queries = ["pizza", "spicy burr", "chick", "classic hamburger", "choc", "vegan fal", "lime", "garden caesar 12"]
+    db = SessionLocal()
+    try:
+        service = FoodService(db)
+        print(f"FoodService.search_foods ({args.items} foods, top 20, {len(queries)} query mixes)")
+        for query in queries:
+            measure_latency(f"q={query!r}", lambda i: service.search_foods(query), args.iterations)
+    finally:
+        db.close()
+
+    with TestClient(app) as client:
+        measure_latency(
+            "GET /foods/search (full HTTP stack)",
+            lambda i: client.get(f"{API}/foods/search", params={"q": queries[i % len(queries)]}),
+            args.iterations,
+        )
+
+
+def bench_stream(args) -> None:
+    """Fan-out of change events to many SSE subscribers, with a few stalled ones."""
+    asyncio.run(_stream_fan_out(args.subscribers, args.events, stalled=10))
+
+
+async def _stream_fan_out(subscribers: int, events: int, stalled: int) -> None:
+    hub = BroadcastHub(max_queue=settings.SSE_QUEUE_SIZE)
+    active = [hub.subscribe() for _ in range(subscribers)]
+    stuck = [hub.subscribe() for _ in range(stalled)]
+    received = [0] * subscribers
+
+    async def consume(index, subscription):
+        while received[index] < events:
+            message = await subscription.queue.get()
+            assert message is not RESET, "an active subscriber was dropped"
+            received[index] += 1
+
+    def publish():
+        # Paced like real writes: each event follows a database commit
+        for i in range(events):
+            hub.publish("food.updated", {"id": i % 100, "stock": i})
+            time.sleep(0.001)
+
+    consumers = [asyncio.create_task(consume(i, sub)) for i, sub in enumerate(active)]
+    start = time.perf_counter()
+    await asyncio.to_thread(publish)
+    await asyncio.gather(*consumers)
+    elapsed = time.perf_counter() - start
+
+    delivered = sum(received)
+    reset = sum(1 for sub in stuck if sub.dropped and sub.queue.get_nowait() is RESET)
+    print(f"BroadcastHub fan-out ({subscribers} active + {stalled} stalled subscribers, {events} events)")
+    print(f"  delivered {delivered} messages in {elapsed:.2f} s ({delivered / elapsed:,.0f} msg/s)")
+    print(f"  active subscribers dropped: {subscribers - sum(1 for r in received if r == events)}")
+    print(f"  stalled subscribers dropped and reset: {reset}/{stalled}")
+    assert delivered == subscribers * events
+    assert reset == stalled
+
+
+def bench_qr(args) -> None:
+    """QR renders per second for each output format, cold and cached."""
+    url = f"{settings.API_BASE_URL}/foods/1"
+
+    def legacy_png():
+        # The pipeline generate_qr_code used before: qrcode draws every box through PIL
+        qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=2)
+        qr.add_data(url)
+        qr.make(fit=True)
+        img_bytes = io.BytesIO()
+        qr.make_image(fill_color="black", back_color="white").save(img_bytes, format="PNG")
+
+    def cold(render):
+        def run():
+            qr_cache.clear()
+            _qr_matrix.cache_clear()
+            render()
+        return run
+
+    # Time the rendering itself, not the hand-off to a worker process
+    qr_render_pool.workers = 0
+    print(f"QRCodeService renders ({url!r}, box size 10, border 2)")
+    before = measure("before: qrcode.make_image -> PNG", legacy_png, args.duration, "render")
+    png = measure("cold: PNG", cold(lambda: QRCodeService.render_qr_code(url)), args.duration, "render")
+    measure("cold: base64 data URI", cold(lambda: QRCodeService.generate_qr_code_base64(url)), args.duration, "render")
+    measure("cold: SVG", cold(lambda: QRCodeService.render_qr_code(url, format="SVG")), args.duration, "render")
+    cached = measure("cached: PNG", lambda: QRCodeService.render_qr_code(url), args.duration, "render")
+    measure("cached: base64 data URI", lambda: QRCodeService.generate_qr_code_base64(url), args.duration, "render")
+    measure("cached: SVG", lambda: QRCodeService.render_qr_code(url, format="SVG"), args.duration, "render")
+    print(f"  speedup: {png / before:.1f}x (cold PNG), {cached / before:.0f}x (cached PNG)")
+
+
+def bench_qr_burst(args) -> None:
+    """Checkout latency while a burst of uncached QR renders hits the API."""
+    seed_foods(args.items)
+    db = SessionLocal()
+    try:
+        db.execute(update(Food).values(stock=10 ** 9))
+        db.commit()
+    finally:
+        db.close()
+    workers = qr_render_pool.workers
+    print(f"POST /orders latency during a burst of {args.subscribers} concurrent QR clients "
+          f"({args.duration:.0f} s per run, QR_RENDER_WORKERS={workers})")
+    asyncio.run(_checkout_during_burst(args, burst=False))
+    qr_render_pool.workers = 0
+    asyncio.run(_checkout_during_burst(args, burst=True, label="before: QR rendered in request threads"))
+    qr_render_pool.workers = workers
+    QRCodeService.render_qr_code("warm up the pool")
+    asyncio.run(_checkout_during_burst(args, burst=True, label="after: QR rendered in process pool"))
+    qr_render_pool.shutdown()
+
+
+async def _checkout_during_burst(args, burst: bool, label: str = "no QR traffic") -> None:
+    qr_cache.clear()
+    transport = httpx.ASGITransport(app=app)
+    order = {"customer_name": "Bench", "customer_email": "bench@example.com", "items": [{"food_id": 1, "quantity": 1}]}
+    deadline = time.perf_counter() + args.duration
+    samples = []
+    qr_status = {}
+    next_food = iter(range(1, args.items + 1))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def checkout():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.post(f"{API}/orders", json=order)
+                samples.append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 201
+                await asyncio.sleep(0.01)
+
+        async def qr_client():
+            # Every request is for a different food, so every one is a cache miss
+            while time.perf_counter() < deadline:
+                response = await client.get(f"{API}/qr/foods/{next(next_food)}/qr")
+                qr_status[response.status_code] = qr_status.get(response.status_code, 0) + 1
+
+        tasks = [checkout()] + [qr_client() for _ in range(args.subscribers if burst else 0)]
+        await asyncio.gather(*tasks)
+
+    print_percentiles(label, samples)
+    if burst:
+        print(f"  {'':<40} QR responses: {dict(sorted(qr_status.items()))}")
+
+
+def bench_pages(args) -> None:
+    """Cost of serving each HTML page, QR images already cached."""
+    seed_foods(args.items)
+    with TestClient(app) as client:
+        order = client.post(f"{API}/orders", json={
+            "customer_name": "Bench", "customer_email": "bench@example.com",
+            "items": [{"food_id": 2, "quantity": 1}],
+        }).json()
+        payment = client.post(f"{API}/payments", json={
+            "order_id": order["id"], "amount": order["total_amount"], "payment_method": "credit_card",
+        }).json()
+        pages = [
+            f"{API}/qr/foods/1/qr/page",
+            f"{API}/qr/orders/{order['id']}/qr/page",
+            f"{API}/qr/orders/{order['id']}/payment/page",
+            f"{API}/qr/payments/{payment['id']}/qr/page",
+            f"{API}/qr/website/qr/page",
+            f"{API}/qr/foods/qr/display",
+            "/qr/foods/qr/display",
+        ]
+        print("HTML pages (full HTTP stack)")
+        for url in pages:
+            response = client.get(url)
+            assert response.status_code == 200, url
+            measure(f"{url.replace(API, '')} ({len(response.content)} B)", lambda: client.get(url), args.duration)
+
+    # Template rendering alone, for the largest dynamic page
+    values = {
+        "order_id": 1, "customer_name": "Bench", "status": "PENDING", "total_amount": "12.50",
+        "qr_code": Markup(QRCodeService.embed_qr_code(QRCodeService.payment_url(1))),
+        "reference_number": "PAY-1", "badge_class": "", "badge": "Payment Pending",
+    }
+    print("Template rendering only")
+    measure("ORDER_PAYMENT_PAGE.render", lambda: qr_routes.ORDER_PAYMENT_PAGE.render(**values), args.duration, "page")
+
+
+def bench_index(args) -> None:
+    """GET / served from memory, compressed and revalidated, against reading index.html per request."""
+    def read_root():
+        with open(INDEX_PATH, "r") as f:
+            return f.read()
+
+    # The old handler, mounted on the same app so both go through the same middleware
+    app.add_api_route("/bench/legacy-index", read_root, response_class=HTMLResponse)
+
+    print("GET / (index.html)")
+    with TestClient(app) as client:
+        size = len(client.get("/bench/legacy-index", headers={"Accept-Encoding": "identity"}).content)
+        before = measure(f"before: read from disk ({size} B)", lambda: client.get("/bench/legacy-index"), args.duration)
+
+        results = {}
+        for encoding in ("identity", "gzip", "br"):
+            headers = {"Accept-Encoding": encoding}
+            response = client.get("/", headers=headers)
+            if response.headers.get("content-encoding", "identity") != encoding:
+                continue
+            results[encoding] = measure(
+                f"after: {encoding} from memory ({response.headers['content-length']} B)",
+                lambda: client.get("/", headers=headers), args.duration,
+            )
+        etag = client.get("/", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+        revalidated = measure(
+            "after: If-None-Match (304)",
+            lambda: client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}),
+            args.duration,
+        )
+    print(f"  speedup: {results['identity'] / before:.1f}x (identity), {revalidated / before:.1f}x (304)")
+
+
+def seed_orders(count: int) -> None:
+    """Insert sample orders into the benchmark database."""
+    rows = [
+        {
+            "customer_name": f"Customer {i}",
+            "customer_email": f"customer{i}@example.com",
+            "total_amount": round(5 + (i % 30) * 1.25, 2),
+            "item_details": json.dumps([{"food_id": i % 50 + 1, "quantity": 1 + i % 3}]),
+            "status": ("pending", "confirmed", "delivered")[i % 3],
+            "is_paid": i % 2 == 0,
+        }
+        for i in range(count)
+    ]
+    db = SessionLocal()
+    try:
+        db.query(Order).delete()
+        db.execute(insert(Order), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def bench_lists(args) -> None:
+    """Per-row cost of a list response: ORM + response_model against row tuples + fast encoder."""
+    adapter = TypeAdapter(List[OrderResponse])
+    encoder = "orjson" if serialization.orjson is not None else "json"
+    db = SessionLocal()
+    repository = OrderRepository(db)
+
+    def orm_and_model(rows):
+        # What FastAPI does for response_model=List[OrderResponse]: validate, dump, json.dumps
+        orders = repository.get_all(0, rows)
+        content = adapter.dump_python(adapter.validate_python(orders, from_attributes=True), mode="json")
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def rows_and_encoder(rows):
+        return dump_rows(ORDER_FIELDS, repository.get_rows(ORDER_FIELDS, 0, rows))
+
+    def stdlib_fallback(rows):
+        fast, serialization.orjson = serialization.orjson, None
+        try:
+            return rows_and_encoder(rows)
+        finally:
+            serialization.orjson = fast
+
+    try:
+        for rows in (100, 1000, 10000):
+            seed_orders(rows)
+            assert json.loads(orm_and_model(rows)) == json.loads(rows_and_encoder(rows))
+            print(f"Order list, {rows} rows (query + serialize)")
+            before = measure("before: ORM objects + response_model", lambda: orm_and_model(rows), args.duration, "list")
+            after = measure(f"after: row tuples + {encoder}", lambda: rows_and_encoder(rows), args.duration, "list")
+            if encoder != "json":
+                measure("after: row tuples + json (fallback)", lambda: stdlib_fallback(rows), args.duration, "list")
+            print(f"  per row: {1e6 / before / rows:.2f} us -> {1e6 / after / rows:.2f} us ({after / before:.1f}x)")
+    finally:
+        db.close()
+
+
+def seed_payments(count: int) -> None:
+    """Insert sample payments into the benchmark database."""
+    methods = ["credit_card", "paypal", "cash"]
+    statuses = ["pending", "completed", "failed", "refunded"]
+    rows = [
+        {
+            "order_id": i % 100 + 1,
+            "payment_method": methods[i % len(methods)].upper(),
+            "amount": round(5 + (i % 30) * 1.25, 2),
+            "status": statuses[i % len(statuses)].upper(),
+        }
+        for i in range(count)
+    ]
+    db = SessionLocal()
+    try:
+        db.query(Payment).delete()
+        db.execute(insert(Payment.__table__), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def bench_coalesce(args) -> None:
+    """Database queries and latency for a burst of identical concurrent reads."""
+    seed_foods(args.items)
+    seed_payments(args.items)
+
+    endpoints = [f"{API}/foods?limit=100", f"{API}/payments/statistics/overview"]
+    print(f"{args.subscribers} concurrent identical GETs ({args.items} foods and payments)")
+    # Measure coalescing on its own: a burst wider than READ_CONCURRENCY would otherwise be partly shed
+    shedding, settings.LOAD_SHEDDING = settings.LOAD_SHEDDING, False
+    try:
+        for enabled in (False, True):
+            read_coalescer.enabled = enabled
+            for url in endpoints:
+                asyncio.run(_identical_burst(url, args.subscribers, enabled))
+    finally:
+        read_coalescer.enabled = True
+        settings.LOAD_SHEDDING = shedding
+    print(f"  coalescer: {read_coalescer.stats()}")
+
+
+async def _identical_burst(url: str, clients: int, coalesced: bool) -> None:
+    # Start from a cold cache and no held results, so every request would have to query
+    catalog_cache.invalidate()
+    read_coalescer.clear()
+    transport = httpx.ASGITransport(app=app)
+    bodies = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def get():
+            start = time.perf_counter()
+            response = await client.get(url)
+            assert response.status_code == 200
+            bodies.append(response.content)
+            return (time.perf_counter() - start) * 1000
+
+        # The requests run in tasks copied from this context, so their queries are counted here too
+        with track_queries() as stats:
+            start = time.perf_counter()
+            samples = await asyncio.gather(*(get() for _ in range(clients)))
+            elapsed = time.perf_counter() - start
+    selects = sum(n for statement, n in stats.statements.items() if statement.lstrip().upper().startswith("SELECT"))
+    print_percentiles(f"{'after' if coalesced else 'before'}: {url.replace(API, '')}", samples)
+    print(f"  {'':<40} {selects} SELECTs, whole burst {elapsed * 1000:.1f} ms")
+    assert len(set(bodies)) == 1, f"{url}: concurrent identical GETs got different bodies"
+    if coalesced:
+        assert selects == 1, f"{url}: {clients} coalesced GETs ran {selects} SELECTs, expected 1"
+
+
+# Responses slower than this do not count towards goodput
+OVERLOAD_SLO_MS = 500
+# Clients give up after this many seconds
+OVERLOAD_CLIENT_TIMEOUT = 5
+
+
+def bench_overload(args) -> None:
+    """Goodput of a read/write mix offered at 3x capacity, with and without load shedding."""
+    seed_foods(args.items)
+    seed_orders(2000)
+    db = SessionLocal()
+    try:
+        db.execute(update(Food).values(stock=10 ** 9))
+        db.commit()
+    finally:
+        db.close()
+
+    shedding = settings.LOAD_SHEDDING
+    settings.LOAD_SHEDDING = False
+    capacity = asyncio.run(_closed_loop_capacity(args))
+    rate = 3 * capacity
+    print(f"Read/write mix: capacity {capacity:.0f} req/s with {args.subscribers} clients; "
+          f"offering {rate:.0f} req/s for {args.duration:.0f} s (SLO {OVERLOAD_SLO_MS} ms)")
+    # Abandoned requests have their sessions closed while a worker thread still
+    # waits for a connection; SQLAlchemy reports each one, which is just noise here
+    unraisablehook, sys.unraisablehook = sys.unraisablehook, lambda unraisable: None
+    try:
+        # Shedding runs first: the unprotected run leaves threads queued on the pool for a while
+        settings.LOAD_SHEDDING = True
+        concurrency_limiters.update(default_limiters())
+        asyncio.run(_open_loop(args, rate, "after: adaptive load shedding"))
+        print(f"  {'':<40} limiters: {dict((name, limiter.stats()) for name, limiter in concurrency_limiters.items())}")
+        settings.LOAD_SHEDDING = False
+        asyncio.run(_open_loop(args, rate, "before: no load shedding"))
+    finally:
+        settings.LOAD_SHEDDING = shedding
+        sys.unraisablehook = unraisablehook
+
+
+def _mixed_request(client, i: int):
+    """Every third request is a checkout, the rest list orders."""
+    if i % 3 == 0:
+        return client.post(f"{API}/orders", json={
+            "customer_name": "Bench", "customer_email": "bench@example.com",
+            "items": [{"food_id": 1 + i % 50, "quantity": 1}],
+        })
+    return client.get(f"{API}/orders?limit=50&skip={i % 1000}")
+
+
+async def _closed_loop_capacity(args) -> float:
+    transport = httpx.ASGITransport(app=app)
+    completed = 0
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + args.duration
+
+        async def worker(offset):
+            nonlocal completed
+            i = offset
+            while time.perf_counter() < deadline:
+                response = await _mixed_request(client, i)
+                assert response.status_code < 400, response.text
+                completed += 1
+                i += args.subscribers
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(args.subscribers)))
+        return completed / (time.perf_counter() - start)
+
+
+async def _open_loop(args, rate: float, label: str) -> None:
+    # Requests arrive on a fixed schedule whether or not earlier ones finished.
+    # Overloaded requests can fail (e.g. DB pool timeouts); count them as 500s.
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    latencies = []
+    statuses = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def one(i):
+            start = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(_mixed_request(client, i), OVERLOAD_CLIENT_TIMEOUT)
+            except asyncio.TimeoutError:
+                statuses["timeout"] = statuses.get("timeout", 0) + 1
+                return
+            latency = (time.perf_counter() - start) * 1000
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code < 400:
+                latencies.append(latency)
+
+        tasks = []
+        start = time.perf_counter()
+        total = int(rate * args.duration)
+        for i in range(total):
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(i)))
+        await asyncio.gather(*tasks)
+        drained = time.perf_counter() - start
+
+    good = sum(1 for latency in latencies if latency <= OVERLOAD_SLO_MS)
+    print_percentiles(label, latencies or [0.0])
+    print(f"  {'':<40} goodput {good / args.duration:>6.1f} req/s  responses {dict(sorted(statuses.items(), key=str))}  "
+          f"drained after {drained:.1f} s")
+
+
+def bench_metrics(args) -> None:
+    """Cost of the metrics middleware on the cheapest requests, where it weighs the most."""
+    seed_foods(args.items)
+    enabled = settings.METRICS
+    rounds = 3
+
+    with TestClient(app) as client:
+        for label, url in (("GET /health", "/health"), ("GET /foods (cached snapshot)", f"{API}/foods")):
+            def get():
+                assert client.get(url).status_code == 200
+
+            print(f"{label}, best of {rounds} alternating rounds")
+            best = {False: 0.0, True: 0.0}
+            try:
+                for _ in range(rounds):
+                    for metrics in (False, True):
+                        settings.METRICS = metrics
+                        best[metrics] = max(best[metrics], measure(f"metrics {'on' if metrics else 'off'}", get, args.duration))
+            finally:
+                settings.METRICS = enabled
+            print(f"  overhead: {(best[False] / best[True] - 1) * 100:.2f}%  "
+                  f"({(1 / best[True] - 1 / best[False]) * 1e6:.1f} us/req)")
+        measure("GET /metrics", lambda: client.get("/metrics"), args.duration)
+
+    # The middleware alone, around an app that does nothing: what every request pays
+    async def noop(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    async def ignore(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/health"}
+    loop = asyncio.new_event_loop()
+    try:
+        print("Middleware alone, around a no-op app")
+        bare = measure("no-op app", lambda: loop.run_until_complete(noop(scope, None, ignore)), args.duration)
+        wrapped = measure("MetricsMiddleware(no-op app)",
+                          lambda: loop.run_until_complete(MetricsMiddleware(noop)(scope, None, ignore)), args.duration)
+    finally:
+        loop.close()
+    print(f"  cost: {(1 / wrapped - 1 / bare) * 1e6:.1f} us/req")
+
+
+def bench_queries(args) -> None:
+    """Queries per request on the main endpoints, as counted for the Server-Timing header."""
+    seed_foods(50)
+    seed_orders(args.items)
+    seed_payments(args.items)
+    read_coalescer.clear()
+    db = SessionLocal()
+    try:
+        db.execute(update(Food).values(stock=1000))
+        db.commit()
+    finally:
+        db.close()
+
+    def order(items: int) -> dict:
+        return {
+            "customer_name": "Bench",
+            "customer_email": "bench@example.com",
+            "items": [{"food_id": food_id, "quantity": 1} for food_id in range(1, items + 1)],
+        }
+
+    requests = [
+        ("GET /foods (cold cache)", "GET", f"{API}/foods", None),
+        ("GET /foods (cached)", "GET", f"{API}/foods", None),
+        ("GET /foods/1", "GET", f"{API}/foods/1", None),
+        ("GET /orders", "GET", f"{API}/orders", None),
+        ("GET /payments", "GET", f"{API}/payments", None),
+        ("GET /payments/statistics/overview", "GET", f"{API}/payments/statistics/overview", None),
+        ("POST /orders (1 item)", "POST", f"{API}/orders/", order(1)),
+        ("POST /orders (5 items)", "POST", f"{API}/orders/", order(5)),
+        ("POST /orders (20 items)", "POST", f"{API}/orders/", order(20)),
+    ]
+    print(f"Queries per request ({args.items} orders and payments)")
+    with TestClient(app) as client:
+        for label, method, url, body in requests:
+            with track_queries() as stats:
+                response = client.request(method, url, json=body)
+            assert response.status_code < 400, (label, response.status_code)
+            repeated = stats.repeated(settings.N_PLUS_ONE_THRESHOLD)
+            note = f"  (one statement {repeated[0][1]}x)" if repeated else ""
+            print(f"  {label:<40} {stats.count:>4} queries  {stats.duration * 1000:>7.2f} ms{note}")
+
+
+def bench_batch(args) -> None:
+    """Twenty reads as one POST /batch vs twenty requests, and what a rolled-back batch leaves behind."""
+    seed_foods(args.items)
+    paths = [f"/foods/{food_id}" for food_id in range(1, 21)]
+    print(f"{len(paths)} GET /foods/{{id}} ({args.items} foods)")
+    with TestClient(app) as client:
+        def separate():
+            for path in paths:
+                assert client.get(API + path).status_code == 200
+
+        def batched():
+            response = client.post(f"{API}/batch", json={"operations": [{"method": "GET", "path": path} for path in paths]})
+            assert all(result["status"] == 200 for result in response.json()["results"])
+
+        # A batch of GETs by id repeats one statement on purpose; do not log it as N+1 on every call
+        threshold, settings.N_PLUS_ONE_THRESHOLD = settings.N_PLUS_ONE_THRESHOLD, len(paths) + 1
+        try:
+            measure("separate requests", separate, args.duration, "batch")
+            measure("one POST /batch", batched, args.duration, "batch")
+        finally:
+            settings.N_PLUS_ONE_THRESHOLD = threshold
+
+        # Each batch writes, reads the written data back, then fails, so it must leave no trace
+        price = client.get(f"{API}/foods/1").json()["price"]
+        client.get(f"{API}/foods")
+        _rolled_back_batch(client, [
+            {"method": "PUT", "path": "/foods/1", "body": {"price": price + 100}},
+            {"method": "GET", "path": "/foods"},
+        ])
+        assert client.get(f"{API}/foods/1").json()["price"] == price, "rolled-back food update is visible"
+        assert client.get(f"{API}/foods").json()[0]["price"] == price, "catalog cache kept a rolled-back update"
+
+        client.get(f"{API}/promotions/active/all")
+        _rolled_back_batch(client, [
+            {"method": "POST", "path": "/promotions", "body": {
+                "code": "GHOST", "title": "Rolled back", "discount_type": "fixed", "discount_value": 1,
+            }},
+            {"method": "GET", "path": "/promotions/active/all"},
+        ])
+        codes = [promotion["code"] for promotion in client.get(f"{API}/promotions/active/all").json()]
+        assert "GHOST" not in codes, "active promotions kept a rolled-back promotion"
+    print("  rolled-back batches left the food catalog and active promotions untouched")
+
+
+def _rolled_back_batch(client: TestClient, operations: list) -> None:
+    missing = {"method": "GET", "path": "/foods/999999999"}
+    response = client.post(f"{API}/batch", json={"operations": [*operations, missing], "atomic": True})
+    assert response.status_code == 200 and response.json()["committed"] is False, response.text
+    assert [result["status"] for result in response.json()["results"]][1:] == [200, 404], response.text
+
+
+ITEMS_DEFAULTS = {
+    "search": 100000,
+    "qr-burst": 20000,
+    "coalesce": 5000,
+    "queries": 1000,
+}
+
+SUBSCRIBERS_DEFAULTS = {
+    "qr-burst": 8,
+    "coalesce": 50,
+    "overload": 8,
+}
+
+BENCHMARKS = {
+    "catalog": bench_catalog,
+    "search": bench_search,
+    "stream": bench_stream,
+    "qr": bench_qr,
+    "qr-burst": bench_qr_burst,
+    "pages": bench_pages,
+    "index": bench_index,
+    "lists": bench_lists,
+    "coalesce": bench_coalesce,
+    "overload": bench_overload,
+    "metrics": bench_metrics,
+    "queries": bench_queries,
+    "batch": bench_batch,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--items", type=int, default=None, help="number of foods to seed")
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds per measurement")
+    parser.add_argument("--iterations", type=int, default=500, help="samples per latency measurement")
+    parser.add_argument("--subscribers", type=int, default=None, help="simulated SSE or QR clients")
+    parser.add_argument("--events", type=int, default=500, help="events to publish")
+    args = parser.parse_args()
+    if args.items is None:
+        args.items = ITEMS_DEFAULTS.get(args.benchmark, 100)
+    if args.subscribers is None:
+        args.subscribers = SUBSCRIBERS_DEFAULTS.get(args.benchmark, 1000)
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Maintenance commands for the Food Shop database.
+
+Usage:
+    python manage.py rebuild-search
+    python manage.py import-foods catalog.csv [--format csv|json] [--chunk-size 1000]
+    python manage.py qr-sheet menu.pdf
+    python manage.py qr-sheet sheets/ --format png
+"""
+import argparse
+import os
+import sys
+from app.core.config import settings
+from app.core.database import SessionLocal, create_tables, engine
+from app.core.fts import rebuild_food_search_index
+from app.services import FoodService, qr_sheet
+from app.services.catalog_import import detect_format, iter_records
+from app.services.qr_code_service import qr_render_pool
+
+
+def rebuild_search(args) -> None:
+    """Rebuild the full-text food search index."""
+    create_tables()
+    rebuild_food_search_index(engine)
+    print("Food search index rebuilt")
+
+
+def import_foods(args) -> None:
+    """Upsert foods by name from a CSV or JSON catalog file."""
+    create_tables()
+    db = SessionLocal()
+    try:
+        with open(args.path, "rb") as stream:
+            records = iter_records(stream, args.format or detect_format(args.path))
+            summary = FoodService(db).import_foods(records, args.chunk_size)
+    finally:
+        db.close()
+    print(summary.model_dump_json(indent=2))
+    if summary.failed:
+        print(f"Skipped {summary.failed} of {summary.total_rows} records:", file=sys.stderr)
+        for error in summary.errors:
+            name = f" ({error.name})" if error.name else ""
+            print(f"  row {error.row}{name}: {error.message}", file=sys.stderr)
+        if summary.failed > len(summary.errors):
+            print(f"  ... and {summary.failed - len(summary.errors)} more", file=sys.stderr)
+
+
+def qr_sheets(args) -> None:
+    """Render printable QR sheets for every food as a PDF or a directory of PNG pages."""
+    create_tables()
+    db = SessionLocal()
+    try:
+        entries = qr_sheet.food_entries(FoodService(db).get_food_labels())
+    finally:
+        db.close()
+    
+    try:
+        if args.format == "pdf":
+            with open(args.output, "wb") as f:
+                for chunk in qr_sheet.iter_pdf(entries):
+                    f.write(chunk)
+        else:
+            os.makedirs(args.output, exist_ok=True)
+            for number, image in enumerate(qr_sheet.iter_png_pages(entries), start=1):
+                with open(os.path.join(args.output, f"sheet-{number:03d}.png"), "wb") as f:
+                    f.write(image)
+    finally:
+        qr_render_pool.shutdown()
+    print(f"{len(entries)} foods on {qr_sheet.page_count(len(entries))} pages written to {args.output}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-search", help="rebuild the full-text food search index")
+    rebuild.set_defaults(func=rebuild_search)
+
+    importer = commands.add_parser("import-foods", help="upsert foods by name from a CSV or JSON file")
+    importer.add_argument("path", help="CSV, JSON array or JSON lines file")
+    importer.add_argument("--format", choices=["csv", "json"], help="defaults to the file extension")
+    importer.add_argument("--chunk-size", type=int, default=settings.FOOD_IMPORT_CHUNK_SIZE)
+    importer.set_defaults(func=import_foods)
+
+    sheets = commands.add_parser("qr-sheet", help="render A4 sheets of QR codes for every food")
+    sheets.add_argument("output", help="PDF file, or a directory for PNG pages")
+    sheets.add_argument("--format", choices=["pdf", "png"], default="pdf")
+    sheets.set_defaults(func=qr_sheets)
+    
+    args = parser.parse_args()
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())